@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 from backend.agents.base import BaseAgent
 from backend.services.llm_service import LLMService
 
@@ -40,3 +40,36 @@ class ExplanationAgent(BaseAgent):
         )
 
         return explanation
+
+    async def stream(
+        self,
+        region: str,
+        news_risk: Optional[dict] = None,
+        weather_risk: Optional[dict] = None,
+        port_risk: Optional[dict] = None,
+        aggregated_risk: Optional[dict] = None,
+        timing: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a plain-language explanation of the risk assessment.
+
+        Args:
+            region: Region being assessed
+            news_risk: Output from news agent
+            weather_risk: Output from weather agent
+            port_risk: Output from port agent
+            aggregated_risk: Output from aggregation agent
+            timing: Filled with ttft_seconds and duration_seconds
+
+        Yields:
+            Explanation text fragments as they are generated
+        """
+        async for text in self.llm_service.stream_explanation(
+            region=region,
+            news_risk=news_risk,
+            weather_risk=weather_risk,
+            port_risk=port_risk,
+            aggregated_risk=aggregated_risk,
+            timing=timing,
+        ):
+            yield text
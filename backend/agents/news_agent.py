@@ -1,43 +1,274 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
 from backend.agents.base import BaseAgent
+from backend.agents.news_relevance import filter_relevant
 from backend.services.news_api import NewsAPIClient
+from backend.services.news_feed import NewsFeed, news_feed
+from backend.services.region_matcher import RegionMatcher
 from backend.services.llm_service import LLMService
+from backend.services.rate_limit import use_deadline
 from backend.models.schemas import NewsRiskOutput
+from backend.config import get_settings
 
 
 class NewsAgent(BaseAgent):
     """Agent for assessing supply chain risks from news sources."""
 
-    def __init__(self):
+    # Most recent articles sent to the LLM per classification
+    MAX_CLASSIFIED_ARTICLES = 10
+    # Wait before retrying a failed combined fetch
+    COMBINED_RETRY_SECONDS = 30.0
+
+    def __init__(self, feed: NewsFeed | None = None):
         super().__init__(name="News Risk Agent")
+        self.settings = get_settings()
         self.news_client = NewsAPIClient()
         self.llm_service = LLMService()
+        self.feed = feed or news_feed
+        # region -> last classification, reused while no new articles arrive
+        self._classifications: dict[str, dict] = {}
+        self.classifications_reused = 0
+        self.articles_filtered = 0
+        self.llm_calls_skipped = 0
+        # Combined fetch mode: one set of queries for all regions, routed locally
+        self.matcher = RegionMatcher.from_regions(self.settings.regions)
+        self._combined_lock = asyncio.Lock()
+        # Earliest time of the next combined fetch (after a success or failure)
+        self._combined_next_at = 0.0
+        self._combined_newest: str | None = None
+        # region -> routed new articles not yet picked up by run()
+        self._routed: dict[str, list[dict]] = {}
+        self.combined_fetches = 0
+        self.combined_queries = 0
+        self.articles_unrouted = 0
+
+    def _relevant(self, articles: list[dict]) -> list[dict]:
+        """Drop articles failing the local relevance pre-filter (if enabled)."""
+        if not self.settings.news_relevance_filter_enabled:
+            return articles
+        return filter_relevant(articles, self.settings.news_relevance_threshold)
+
+    def _place_names(self) -> list[str]:
+        """Region, port and alias names covered by the combined queries."""
+        names = []
+        for region, config in self.settings.regions.items():
+            names.extend([region, config.get("port", ""), *config.get("aliases", [])])
+        return [name for name in names if name]
+
+    def calls_per_refresh(self, regions: int) -> int:
+        """
+        NewsAPI calls that refreshing ``regions`` regions costs in the configured mode.
+
+        Per-region mode sends one query per region; combined mode sends the
+        same few broad queries once for all regions.
+        """
+        if self.settings.news_fetch_mode == "combined":
+            return len(self.news_client.build_combined_queries(self._place_names()))
+        return regions
+
+    def _route(self, articles: list[dict]) -> None:
+        """Add combined-fetch articles to the feed of every region they mention."""
+        groups: dict[str, list[dict]] = {}
+        for article in articles:
+            text = f"{article.get('title') or ''} {article.get('description') or ''}"
+            regions = self.matcher.match(text)
+            if not regions:
+                self.articles_unrouted += 1
+            for region in regions:
+                groups.setdefault(region, []).append(article)
+
+        for region, group in groups.items():
+            self._routed.setdefault(region, []).extend(self.feed.add(region, group))
+
+    async def _refresh_combined(self) -> None:
+        """
+        Run the combined queries unless they are backing off.
+
+        After a successful fetch the next one waits for
+        ``Settings.news_combined_min_interval_seconds``; after a failure
+        only for ``COMBINED_RETRY_SECONDS``.
+        """
+        async with self._combined_lock:
+            if time.monotonic() < self._combined_next_at:
+                return
+
+            news_result = await self.news_client.fetch_combined_supply_chain_news(
+                self._place_names(), published_after=self._combined_newest
+            )
+            self.combined_fetches += 1
+            self.combined_queries += news_result.get("queries", 0)
+            if news_result["status"] != "ok":
+                print(f"[NewsAgent] Combined news fetch failed: {news_result.get('message')}")
+                self._combined_next_at = time.monotonic() + self.COMBINED_RETRY_SECONDS
+                return
+            self._combined_next_at = (
+                time.monotonic() + self.settings.news_combined_min_interval_seconds
+            )
+
+            articles = news_result.get("articles", [])
+            for article in articles:
+                published_at = article.get("published_at")
+                if published_at and published_at > (self._combined_newest or ""):
+                    self._combined_newest = published_at
+            self._route(articles)
+
+    async def _fetch_new_articles(self, region: str) -> list[dict]:
+        """
+        Fetch a region's articles in the configured mode.
+
+        Returns:
+            Articles new to the region's feed
+        """
+        if self.settings.news_fetch_mode == "combined":
+            await self._refresh_combined()
+            return self._routed.pop(region, [])
+
+        # Fetch supply chain related news for the region
+        news_result = await self.news_client.fetch_supply_chain_news(
+            region, published_after=self.feed.newest_published_at(region)
+        )
+        if news_result["status"] != "ok":
+            return []
+        return self.feed.add(region, news_result.get("articles", []))
 
     async def run(self, region: str) -> dict:
         """
         Fetch and analyze news for supply chain risks.
 
+        Only articles newer than the newest one already seen are fetched,
+        either per region or, in "combined" fetch mode, with a few shared
+        queries whose articles are routed to the regions they mention.
+        Articles failing the local relevance pre-filter are
+        never sent to the LLM; if none pass, the result is event_type "none"
+        without an LLM call. When no new relevant article arrived, the
+        previous classification is reused.
+
         Args:
             region: Region to analyze (e.g., "Shanghai")
 
         Returns:
             dict with NewsRiskOutput fields
         """
-        # Fetch supply chain related news for the region
-        news_result = await self.news_client.fetch_supply_chain_news(region)
+        output, articles = await self._prepare(region)
+        if output is not None:
+            return output
 
-        if news_result["status"] != "ok" or not news_result.get("articles"):
+        # Use LLM to classify and assess risk
+        classification = await self.llm_service.classify_news_risk(articles)
+        return self._to_output(region, classification, articles)
+
+    async def run_batch(
+        self, regions: list[str], timeout: Optional[float] = None
+    ) -> dict[str, NewsRiskOutput]:
+        """
+        Fetch and analyze news for several regions at once.
+
+        Works like run() for each region, but the regions that need a fresh
+        LLM classification are classified together in batched LLM calls.
+        Regions whose fetch fails are left out of the result.
+
+        With a timeout, each region's fetch and the batched classification
+        each get that deadline, so a slow region or classification only
+        loses the regions it holds up.
+
+        Args:
+            regions: Regions to analyze
+            timeout: Deadline in seconds per fetch and per classification
+
+        Returns:
+            Region name -> NewsRiskOutput
+        """
+        prepared = await asyncio.gather(
+            *(self._within(self._prepare(region), timeout) for region in regions),
+            return_exceptions=True,
+        )
+
+        results = {}
+        pending = {}
+        for region, outcome in zip(regions, prepared):
+            if isinstance(outcome, asyncio.TimeoutError):
+                print(f"[NewsAgent] News refresh for {region} timed out after {timeout}s")
+                continue
+            if isinstance(outcome, Exception):
+                print(f"[NewsAgent] News refresh for {region} failed: {str(outcome)}")
+                continue
+            output, articles = outcome
+            if output is not None:
+                results[region] = output
+            else:
+                pending[region] = articles
+
+        if pending:
+            try:
+                classifications = await self._within(
+                    self.llm_service.classify_news_risk_batch(pending), timeout
+                )
+            except asyncio.TimeoutError:
+                names = ", ".join(pending)
+                print(f"[NewsAgent] News classification for {names} timed out after {timeout}s")
+                return results
+            for region, articles in pending.items():
+                results[region] = self._to_output(region, classifications[region], articles)
+        return results
+
+    @staticmethod
+    async def _within(coro: Awaitable[Any], timeout: Optional[float]) -> Any:
+        """Await a coroutine, bounding it (and its upstream queueing) by an optional deadline."""
+        if timeout is None:
+            return await coro
+        with use_deadline(timeout):
+            return await asyncio.wait_for(coro, timeout=timeout)
+
+    async def _prepare(self, region: str) -> tuple[NewsRiskOutput | None, list[dict]]:
+        """
+        Fetch a region's new articles and decide whether it needs an LLM call.
+
+        Returns:
+            (output, []) when the result is known without the LLM, otherwise
+            (None, articles to classify)
+        """
+        fetched = await self._fetch_new_articles(region)
+        new_articles = self._relevant(fetched)
+        self.articles_filtered += len(fetched) - len(new_articles)
+
+        recent = self.feed.recent(region, self.settings.news_window_size)
+        if not recent:
             # Fallback response when no news available
             return NewsRiskOutput(
                 event_type="none",
                 severity=1,
                 summary=f"No recent supply chain news found for {region}.",
                 sources=[],
-            )
+            ), []
+
+        articles = self._relevant(recent)[: self.MAX_CLASSIFIED_ARTICLES]
+        if not articles:
+            # Nothing passed the pre-filter: no LLM call needed
+            self.llm_calls_skipped += 1
+            self._classifications.pop(region, None)
+            return NewsRiskOutput(
+                event_type="none",
+                severity=1,
+                summary=f"No supply chain relevant news found for {region}.",
+                sources=[],
+            ), []
 
-        articles = news_result["articles"]
+        classification = self._classifications.get(region)
+        if classification is not None and not new_articles:
+            self.classifications_reused += 1
+            return self._to_output(region, classification, articles), []
+        return None, articles
 
-        # Use LLM to classify and assess risk
-        classification = await self.llm_service.classify_news_risk(articles)
+    def _to_output(
+        self, region: str, classification: dict, articles: list[dict]
+    ) -> NewsRiskOutput:
+        """Build a region's output, remembering its classification if the LLM call succeeded."""
+        if classification.get("error"):
+            # Classify again on the next run instead of reusing the error
+            self._classifications.pop(region, None)
+        else:
+            self._classifications[region] = classification
 
         # Extract source names
         sources = [article.get("source", "Unknown") for article in articles[:5]]
@@ -48,3 +279,17 @@ class NewsAgent(BaseAgent):
             summary=classification["summary"],
             sources=sources,
         )
+
+    def get_stats(self) -> dict:
+        """Get news feed, fetch mode, pre-filter, classification reuse and batching counters."""
+        return {
+            **self.feed.get_stats(),
+            "fetch_mode": self.settings.news_fetch_mode,
+            "combined_fetches": self.combined_fetches,
+            "combined_queries": self.combined_queries,
+            "articles_unrouted": self.articles_unrouted,
+            "classifications_reused": self.classifications_reused,
+            "articles_filtered": self.articles_filtered,
+            "llm_calls_skipped": self.llm_calls_skipped,
+            "llm_batch": dict(self.llm_service.batch_stats),
+        }
@@ -0,0 +1,105 @@
+"""Local keyword scoring of news articles for supply chain relevance."""
+
+import re
+
+
+# Disruption terms only count when the article also has shipping or trade
+# context, so "war" or "storm" alone does not make a story relevant
+DISRUPTION_TERMS = frozenset(
+    (
+        "strike", "strikes", "walkout", "lockout", "congestion", "backlog",
+        "closure", "closed", "shutdown", "blockade", "typhoon", "hurricane",
+        "cyclone", "storm", "flood", "flooding", "earthquake", "tsunami",
+        "fire", "explosion", "collision", "grounding", "sanctions", "tariff",
+        "tariffs", "embargo", "protest", "outbreak", "lockdown", "delay",
+        "delays", "disruption", "disruptions", "disrupted", "suspended",
+        "halted", "attack", "conflict", "war",
+    )
+)
+
+# Term weights. Off-topic terms push technology, sport and entertainment
+# stories that happen to mention a port city below the threshold.
+TERM_WEIGHTS = {
+    **dict.fromkeys(DISRUPTION_TERMS, 3.0),
+    **dict.fromkeys(
+        (
+            "port", "ports", "harbor", "harbour", "terminal", "terminals",
+            "shipping", "vessel", "vessels", "ship", "ships", "cargo",
+            "container ship", "container ships", "freight", "logistics",
+            "supply chain", "supply chains", "dock", "docks", "dockworkers",
+            "longshore", "longshoremen", "berth", "anchorage", "maritime",
+            "carrier", "carriers", "teu",
+        ),
+        2.0,
+    ),
+    **dict.fromkeys(("container", "containers", "trade", "exports", "imports"), 1.0),
+    **dict.fromkeys(
+        (
+            "smartphone", "iphone", "android", "software", "kubernetes", "docker",
+            "app", "gaming", "video game", "celebrity", "movie", "film", "football",
+            "soccer", "nba", "crypto", "bitcoin", "recipe", "fashion",
+        ),
+        -3.0,
+    ),
+}
+
+# Shipping and trade terms providing the context disruption terms need
+CONTEXT_TERMS = frozenset(term for term, weight in TERM_WEIGHTS.items() if weight > 0) - (
+    DISRUPTION_TERMS
+)
+
+# Matches in the title count this many times
+TITLE_WEIGHT = 2.0
+
+# Longest terms first so "container ship" wins over "container"
+_TERM_PATTERN = re.compile(
+    r"\b("
+    + "|".join(re.escape(term) for term in sorted(TERM_WEIGHTS, key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+
+
+def _terms(text: str) -> set[str]:
+    """Distinct weighted terms found in a text."""
+    return {match.lower() for match in _TERM_PATTERN.findall(text or "")}
+
+
+def _term_score(terms: set[str], context: bool) -> float:
+    """Sum of the term weights (disruption terms only with context)."""
+    return sum(
+        TERM_WEIGHTS[term] for term in terms if context or term not in DISRUPTION_TERMS
+    )
+
+
+def relevance_score(article: dict) -> float:
+    """
+    Score how likely an article is to describe a supply chain disruption.
+
+    Disruption terms are only counted when the title or description also
+    mentions shipping or trade.
+
+    Args:
+        article: Article with title and description
+
+    Returns:
+        Weighted keyword score (higher is more relevant)
+    """
+    title = _terms(article.get("title") or "")
+    description = _terms(article.get("description") or "")
+    context = bool((title | description) & CONTEXT_TERMS)
+    return TITLE_WEIGHT * _term_score(title, context) + _term_score(description, context)
+
+
+def filter_relevant(articles: list[dict], threshold: float) -> list[dict]:
+    """
+    Keep the articles scoring at least ``threshold``, preserving order.
+
+    Args:
+        articles: Articles to filter
+        threshold: Minimum relevance score
+
+    Returns:
+        The relevant articles
+    """
+    return [article for article in articles if relevance_score(article) >= threshold]
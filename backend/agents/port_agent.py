@@ -84,7 +84,11 @@ class PortAgent(BaseAgent):
             return "critical"
 
     def _estimate_delay_from_congestion(self, severity: int, vessel_count: int) -> float:
-        """Estimate average delay based on congestion severity and vessel count."""
+        """
+        Estimate average delay based on congestion severity and vessel count.
+
+        Only used when no completed anchorage waits have been observed yet.
+        """
         # Base delay hours per severity level
         base_delays = {1: 3, 2: 12, 3: 36, 4: 72, 5: 120}
         base_delay = base_delays.get(severity, 24)
@@ -94,10 +98,8 @@ class PortAgent(BaseAgent):
             base_delay *= 1.5
         elif vessel_count > 20:
             base_delay *= 1.2
-        
-        # Add some realistic variation
-        variation = random.uniform(0.8, 1.2)
-        return base_delay * variation
+
+        return base_delay
 
     async def _get_real_port_data(self, region: str) -> Optional[dict]:
         """Attempt to get real port data from AIS Stream."""
@@ -166,11 +168,24 @@ class PortAgent(BaseAgent):
         vessel_count = ais_metrics.get("vessel_count", 0)
         stationary_count = ais_metrics.get("stationary_count", 0)
         avg_speed = ais_metrics.get("avg_speed", 0)
+        queue_length = ais_metrics.get("queue_length")
+        median_wait = ais_metrics.get("median_wait_hours")
+        p90_wait = ais_metrics.get("p90_wait_hours")
 
         # Calculate severity and congestion
         severity = self._calculate_severity_from_vessels(vessel_count, stationary_count)
         congestion_level = self._get_congestion_level(severity)
-        avg_delay = self._estimate_delay_from_congestion(severity, vessel_count)
+
+        # Prefer observed anchorage waits over the severity-based estimate
+        # once enough waits have completed to be representative
+        completed_waits = ais_metrics.get("completed_waits") or 0
+        observed_waits = (
+            median_wait is not None and completed_waits >= self.settings.ais_min_completed_waits
+        )
+        if observed_waits:
+            avg_delay = median_wait
+        else:
+            avg_delay = self._estimate_delay_from_congestion(severity, vessel_count)
 
         # Build detailed description
         port_name = self.settings.regions.get(region, {}).get("port", region)
@@ -180,6 +195,13 @@ class PortAgent(BaseAgent):
             f"{stationary_count} vessels are stationary (anchored/moored). "
             f"Average vessel speed: {avg_speed:.1f} knots. "
         )
+        if queue_length is not None:
+            details += f"{queue_length} vessels are waiting at anchor. "
+        if observed_waits:
+            details += (
+                f"Median anchorage wait: {median_wait:.1f} hours "
+                f"(90th percentile {p90_wait:.1f} hours). "
+            )
 
         if severity >= 4:
             details += "Significant congestion detected - expect major delays for incoming cargo."
@@ -194,7 +216,8 @@ class PortAgent(BaseAgent):
             congestion_level=congestion_level,
             severity=severity,
             details=details,
-            vessel_queue=vessel_count,
+            vessel_queue=queue_length if queue_length is not None else vessel_count,
             avg_delay_hours=round(avg_delay, 1),
+            confidence=ais_metrics.get("confidence"),
         )
 
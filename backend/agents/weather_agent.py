@@ -1,6 +1,10 @@
+import asyncio
+from typing import Optional
 from backend.agents.base import BaseAgent
+from backend.agents.weather_scoring import score_forecasts
 from backend.services.weather_api import WeatherAPIClient
 from backend.models.schemas import WeatherRiskOutput
+from backend.services.rate_limit import use_deadline
 
 
 class WeatherAgent(BaseAgent):
@@ -11,6 +15,8 @@ class WeatherAgent(BaseAgent):
     WIND_THRESHOLDS = [(80, 5), (60, 4), (40, 3), (25, 2)]  # (km/h, severity)
     TEMP_EXTREME_LOW = 0  # Celsius
     TEMP_EXTREME_HIGH = 40  # Celsius
+    # Forecast slots (3-hour intervals) that count towards the current severity
+    NEAR_TERM_SLOTS = 8
 
     def __init__(self):
         super().__init__(name="Weather Risk Agent")
@@ -62,6 +68,24 @@ class WeatherAgent(BaseAgent):
         # Return maximum severity and combined conditions
         return max(severities), ", ".join(conditions)
 
+    def score_forecasts(self, forecasts: list[list[dict] | None]) -> list[dict]:
+        """
+        Score full forecasts for many ports with this agent's thresholds.
+
+        Args:
+            forecasts: One forecast list per port (None if unavailable)
+
+        Returns:
+            One dict per port with "timeline" and "worst_window"
+        """
+        return score_forecasts(
+            forecasts,
+            self.RAINFALL_THRESHOLDS,
+            self.WIND_THRESHOLDS,
+            self.TEMP_EXTREME_LOW,
+            self.TEMP_EXTREME_HIGH,
+        )
+
     async def run(self, region: str) -> dict:
         """
         Fetch and analyze weather data for supply chain risks.
@@ -73,7 +97,55 @@ class WeatherAgent(BaseAgent):
             dict with WeatherRiskOutput fields
         """
         weather_result = await self.weather_client.fetch_weather_for_region(region)
+        forecast = weather_result.get("forecast") or []
+        outlook = self.score_forecasts([forecast])[0]
+        return self._to_output(region, weather_result, outlook)
+
+    async def run_batch(
+        self, regions: list[str], timeout: Optional[float] = None
+    ) -> dict[str, WeatherRiskOutput]:
+        """
+        Fetch and analyze weather for several regions at once.
 
+        Locations are fetched concurrently (shared locations once, bounded by
+        ``Settings.weather_bulk_concurrency``) and every forecast is scored in
+        one vectorized pass. With a timeout, regions whose weather has not
+        arrived by then are left out; the others are still returned.
+
+        Args:
+            regions: Regions to analyze
+            timeout: Deadline in seconds for the fetches
+
+        Returns:
+            Region name -> WeatherRiskOutput
+        """
+        fetched: dict[str, dict] = {}
+
+        async def collect() -> None:
+            async for region, result in self.weather_client.fetch_weather_for_regions(regions):
+                fetched[region] = result
+
+        if timeout is None:
+            await collect()
+        else:
+            try:
+                with use_deadline(timeout):
+                    await asyncio.wait_for(collect(), timeout=timeout)
+            except asyncio.TimeoutError:
+                missing = ", ".join(region for region in regions if region not in fetched)
+                print(f"[WeatherAgent] Weather for {missing} timed out after {timeout}s")
+
+        names = [region for region in regions if region in fetched]
+        outlooks = self.score_forecasts(
+            [fetched[region].get("forecast") or [] for region in names]
+        )
+        return {
+            region: self._to_output(region, fetched[region], outlook)
+            for region, outlook in zip(names, outlooks)
+        }
+
+    def _to_output(self, region: str, weather_result: dict, outlook: dict) -> WeatherRiskOutput:
+        """Build a region's output from its fetched weather and scored forecast."""
         if weather_result["status"] != "ok" or not weather_result.get("current"):
             return WeatherRiskOutput(
                 weather_condition="unknown",
@@ -90,12 +162,12 @@ class WeatherAgent(BaseAgent):
         wind_speed = current.get("wind_speed_kmh")
         rainfall = current.get("rain_1h_mm", 0) or current.get("rain_3h_mm", 0) or 0
 
-        # Check forecast for upcoming severe weather
-        forecast = weather_result.get("forecast", [])
+        # Check the next 24 hours of the forecast for upcoming severe weather
+        forecast = weather_result.get("forecast") or []
         max_forecast_rainfall = 0
         max_forecast_wind = 0
 
-        for fc in forecast or []:
+        for fc in forecast[: self.NEAR_TERM_SLOTS]:
             max_forecast_rainfall = max(max_forecast_rainfall, fc.get("rain_3h_mm", 0) or 0)
             max_forecast_wind = max(max_forecast_wind, fc.get("wind_speed_kmh", 0) or 0)
 
@@ -119,6 +191,14 @@ class WeatherAgent(BaseAgent):
         weather_desc = current.get("description", current.get("condition", "unknown"))
         details = f"{weather_desc.capitalize()}. {', '.join(details_parts)}"
 
+        # The full forecast horizon gives the timeline and worst window
+        worst_window = outlook["worst_window"]
+        if worst_window and worst_window["peak_severity"] > 1:
+            details += (
+                f". Worst forecast window: {worst_window['start']} to {worst_window['end']} "
+                f"(peak severity {worst_window['peak_severity']})"
+            )
+
         return WeatherRiskOutput(
             weather_condition=condition if severity > 1 else weather_desc,
             severity=severity,
@@ -126,4 +206,6 @@ class WeatherAgent(BaseAgent):
             temperature_c=temperature,
             wind_speed_kmh=wind_speed,
             rainfall_mm=effective_rainfall,
+            severity_timeline=outlook["timeline"] or None,
+            worst_window=worst_window,
         )
@@ -0,0 +1,164 @@
+"""Vectorized weather severity scoring over full forecast horizons."""
+
+from typing import Optional
+import numpy as np
+
+
+# Forecast readings are 3 hours apart
+SLOT_HOURS = 3
+
+
+def _threshold_scores(values: np.ndarray, thresholds: list[tuple[float, int]]) -> np.ndarray:
+    """
+    Map values to severities with (threshold, severity) pairs.
+
+    A value scores the severity of the highest threshold it reaches, or 1 if
+    it reaches none. Missing values (NaN) score 1.
+    """
+    ordered = sorted(thresholds)
+    limits = np.array([threshold for threshold, _ in ordered], dtype=float)
+    levels = np.array([1] + [severity for _, severity in ordered], dtype=np.int8)
+    filled = np.where(np.isnan(values), -np.inf, values)
+    return levels[np.searchsorted(limits, filled, side="right")]
+
+
+def score_readings(
+    temperature: np.ndarray,
+    wind_kmh: np.ndarray,
+    rain_mm: np.ndarray,
+    rain_thresholds: list[tuple[float, int]],
+    wind_thresholds: list[tuple[float, int]],
+    temp_low: float,
+    temp_high: float,
+) -> np.ndarray:
+    """
+    Score weather readings in one pass.
+
+    All inputs are arrays of the same shape (e.g. ports x forecast slots);
+    NaN marks a missing reading.
+
+    Returns:
+        int8 array of severities (1-5), the maximum of the rainfall, wind and
+        temperature-extreme scores of each reading
+    """
+    severity = np.maximum(
+        _threshold_scores(rain_mm, rain_thresholds),
+        _threshold_scores(wind_kmh, wind_thresholds),
+    )
+    with np.errstate(invalid="ignore"):
+        extreme = (temperature <= temp_low) | (temperature >= temp_high)
+    return np.maximum(severity, np.where(extreme, 4, 1).astype(np.int8))
+
+
+def forecasts_to_arrays(forecasts: list[Optional[list[dict]]]) -> tuple[np.ndarray, ...]:
+    """
+    Stack per-port forecast lists into (ports x slots) arrays.
+
+    Shorter or missing forecasts are padded with NaN.
+
+    Returns:
+        (temperature_c, wind_speed_kmh, rain_3h_mm) arrays
+    """
+    slots = max((len(forecast or []) for forecast in forecasts), default=0)
+    arrays = []
+    for field in ("temperature_c", "wind_speed_kmh", "rain_3h_mm"):
+        values = np.full((len(forecasts), slots), np.nan)
+        for row, forecast in enumerate(forecasts):
+            if forecast:
+                # dtype=float turns missing (None) readings into NaN
+                values[row, : len(forecast)] = np.array(
+                    [reading.get(field) for reading in forecast], dtype=float
+                )
+        arrays.append(values)
+    return tuple(arrays)
+
+
+def worst_windows(severity: np.ndarray, valid: np.ndarray, window_slots: int) -> dict[str, np.ndarray]:
+    """
+    Find each port's worst run of ``window_slots`` consecutive readings.
+
+    Windows are ranked by mean severity using a cumulative sum, so every
+    window of every port is evaluated at once.
+
+    Args:
+        severity: (ports x slots) severities
+        valid: (ports x slots) mask of slots holding a reading
+        window_slots: Window length in slots (clipped to the horizon)
+
+    Returns:
+        dict of per-port arrays: start (slot index), mean and peak severity
+    """
+    ports, slots = severity.shape
+    if slots == 0:
+        empty = np.zeros(ports)
+        return {"start": empty.astype(int), "mean": empty, "peak": empty.astype(np.int8)}
+
+    window = max(1, min(window_slots, slots))
+    scores = np.where(valid, severity, 0).astype(float)
+    cumulative = np.concatenate([np.zeros((ports, 1)), np.cumsum(scores, axis=1)], axis=1)
+    counts = np.concatenate([np.zeros((ports, 1)), np.cumsum(valid, axis=1)], axis=1)
+    window_sums = cumulative[:, window:] - cumulative[:, :-window]
+    window_counts = counts[:, window:] - counts[:, :-window]
+    means = np.divide(
+        window_sums, window_counts, out=np.zeros_like(window_sums), where=window_counts > 0
+    )
+
+    start = np.argmax(means, axis=1)
+    rows = np.arange(ports)
+    offsets = start[:, None] + np.arange(window)
+    peak = np.where(valid[rows[:, None], offsets], severity[rows[:, None], offsets], 0).max(axis=1)
+    return {"start": start, "mean": means[rows, start], "peak": peak.astype(np.int8)}
+
+
+def score_forecasts(
+    forecasts: list[Optional[list[dict]]],
+    rain_thresholds: list[tuple[float, int]],
+    wind_thresholds: list[tuple[float, int]],
+    temp_low: float,
+    temp_high: float,
+    window_hours: int = 24,
+) -> list[dict]:
+    """
+    Score full forecasts for many ports.
+
+    Args:
+        forecasts: One forecast list per port (readings shaped like
+            WeatherAPIClient.fetch_forecast data), None if unavailable
+        rain_thresholds: (mm per 3h, severity) pairs
+        wind_thresholds: (km/h, severity) pairs
+        temp_low: Temperature at or below which conditions are extreme
+        temp_high: Temperature at or above which conditions are extreme
+        window_hours: Length of the worst-window summary
+
+    Returns:
+        One dict per port with "timeline" (per-slot severities) and
+        "worst_window" (start, end, peak_severity, mean_severity; None if
+        the port has no forecast)
+    """
+    temperature, wind, rain = forecasts_to_arrays(forecasts)
+    valid = ~(np.isnan(temperature) & np.isnan(wind) & np.isnan(rain))
+    severity = score_readings(
+        temperature, wind, rain, rain_thresholds, wind_thresholds, temp_low, temp_high
+    )
+    window_slots = max(1, window_hours // SLOT_HOURS)
+    windows = worst_windows(severity, valid, window_slots)
+
+    results = []
+    for row, forecast in enumerate(forecasts):
+        forecast = forecast or []
+        timeline = [
+            {"datetime": reading.get("datetime"), "severity": int(severity[row, col])}
+            for col, reading in enumerate(forecast)
+        ]
+        worst = None
+        if forecast:
+            start = int(windows["start"][row])
+            end = min(start + window_slots, len(forecast)) - 1
+            worst = {
+                "start": forecast[start].get("datetime"),
+                "end": forecast[end].get("datetime"),
+                "peak_severity": int(windows["peak"][row]),
+                "mean_severity": round(float(windows["mean"][row]), 2),
+            }
+        results.append({"timeline": timeline, "worst_window": worst})
+    return results
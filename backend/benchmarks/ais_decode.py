@@ -0,0 +1,158 @@
+"""
+Micro-benchmark for AIS Stream frame decoding.
+
+Compares the original per-frame handling (``json.loads`` into nested dicts
+followed by chained ``.get`` calls) with the fast path in
+``backend.services.ais_decode`` (substring pre-filter, fixed-shape record,
+optional orjson backend) on a synthetic feed mixing position reports with
+other message types. Results are single-core messages per second.
+
+Usage:
+    python -m backend.benchmarks.ais_decode [--messages 200000] [--position-share 0.7]
+"""
+
+import argparse
+import json
+import random
+import time
+from backend.services import ais_decode
+
+
+def make_position_report(rng: random.Random) -> str:
+    """Build a PositionReport frame shaped like AIS Stream output."""
+    mmsi = rng.randrange(200000000, 800000000)
+    lat, lon = rng.uniform(30.9, 31.5), rng.uniform(121.2, 122.0)
+    return json.dumps(
+        {
+            "Message": {
+                "PositionReport": {
+                    "Cog": rng.uniform(0, 360),
+                    "CommunicationState": 81982,
+                    "Latitude": lat,
+                    "Longitude": lon,
+                    "MessageID": 1,
+                    "NavigationalStatus": rng.choice([0, 0, 1, 5, 8]),
+                    "PositionAccuracy": True,
+                    "Raim": False,
+                    "RateOfTurn": 0,
+                    "RepeatIndicator": 0,
+                    "Sog": rng.uniform(0, 18),
+                    "Spare": 0,
+                    "SpecialManoeuvreIndicator": 0,
+                    "Timestamp": 31,
+                    "TrueHeading": 215,
+                    "UserID": mmsi,
+                    "Valid": True,
+                }
+            },
+            "MessageType": "PositionReport",
+            "MetaData": {
+                "MMSI": mmsi,
+                "MMSI_String": mmsi,
+                "ShipName": "SYNTHETIC VESSEL    ",
+                "latitude": lat,
+                "longitude": lon,
+                "time_utc": "2024-01-15 10:30:00.123456789 +0000 UTC",
+            },
+        },
+        separators=(",", ":"),
+    )
+
+
+def make_static_data(rng: random.Random) -> str:
+    """Build a ShipStaticData frame (rejected by the pipeline)."""
+    mmsi = rng.randrange(200000000, 800000000)
+    return json.dumps(
+        {
+            "Message": {
+                "ShipStaticData": {
+                    "CallSign": "ABCD123",
+                    "Destination": "SHANGHAI",
+                    "Dimension": {"A": 120, "B": 30, "C": 10, "D": 12},
+                    "ImoNumber": 9876543,
+                    "MaximumStaticDraught": 9.1,
+                    "Name": "SYNTHETIC VESSEL",
+                    "Type": 70,
+                    "UserID": mmsi,
+                }
+            },
+            "MessageType": "ShipStaticData",
+            "MetaData": {"MMSI": mmsi, "time_utc": "2024-01-15 10:30:00.123456789 +0000 UTC"},
+        },
+        separators=(",", ":"),
+    )
+
+
+def legacy_decode(message_json):
+    """The original decoding: full parse and chained .get lookups."""
+    message = json.loads(message_json)
+    if message.get("MessageType") == "PositionReport":
+        ais_msg = message.get("Message", {}).get("PositionReport", {})
+        vessel_id = ais_msg.get("UserID")
+        if vessel_id:
+            return {
+                "mmsi": vessel_id,
+                "latitude": ais_msg.get("Latitude"),
+                "longitude": ais_msg.get("Longitude"),
+                "sog": ais_msg.get("Sog", 0),
+                "cog": ais_msg.get("Cog", 0),
+                "nav_status": ais_msg.get("NavigationalStatus", 0),
+            }
+    return None
+
+
+def _throughput(decode, frames) -> float:
+    """Messages per second for a decode function over all frames."""
+    started = time.perf_counter()
+    for frame in frames:
+        decode(frame)
+    return len(frames) / (time.perf_counter() - started)
+
+
+def run(num_messages: int, position_share: float, seed: int = 7) -> dict:
+    """Run the benchmark and return messages/second per decoder."""
+    rng = random.Random(seed)
+    frames = [
+        make_position_report(rng) if rng.random() < position_share else make_static_data(rng)
+        for _ in range(num_messages)
+    ]
+    binary_frames = [frame.encode() for frame in frames]
+
+    results = {
+        "messages": num_messages,
+        "position_share": position_share,
+        "json_backend": ais_decode.JSON_BACKEND,
+        "legacy_msgs_per_second": round(_throughput(legacy_decode, frames)),
+        "fast_path_msgs_per_second": round(
+            _throughput(ais_decode.decode_position_report, binary_frames)
+        ),
+    }
+
+    # Fast path restricted to the stdlib parser, to isolate the pre-filter gain
+    optional_backend = ais_decode.orjson
+    ais_decode.orjson = None
+    try:
+        results["fast_path_stdlib_json_msgs_per_second"] = round(
+            _throughput(ais_decode.decode_position_report, frames)
+        )
+    finally:
+        ais_decode.orjson = optional_backend
+
+    results["speedup"] = round(
+        results["fast_path_msgs_per_second"] / results["legacy_msgs_per_second"], 2
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--position-share", type=float, default=0.7)
+    args = parser.parse_args()
+
+    for key, value in run(args.messages, args.position_share).items():
+        print(f"{key:>38}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Deterministic ingestion and congestion-scoring benchmark.
+
+Replays a recorded AIS frame log (or a synthetic one) through a local
+replay server into the ingestion daemon, then reports ingestion throughput
+and the resulting per-region congestion metrics and port severities. The
+same log always yields the same congestion figures, so changes to the
+pipeline can be compared offline.
+
+Usage:
+    python -m backend.benchmarks.ais_ingest                     # synthetic feed
+    python -m backend.benchmarks.ais_ingest --log rec.aislog.gz --speed 0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from backend.agents.port_agent import PortAgent
+from backend.config import get_settings
+from backend.services.ais_ingest import AISIngestionDaemon
+from backend.services.ais_log import AISLogWriter, read_ais_log
+from backend.tools.ais_replay import AISReplayServer
+
+
+def write_synthetic_log(path: str, num_frames: int, vessels_per_region: int, seed: int = 7) -> None:
+    """Write a synthetic log of position reports spread over every region's bbox."""
+    rng = random.Random(seed)
+    settings = get_settings()
+    fleet = []
+    for config in settings.regions.values():
+        if "bbox" not in config:
+            continue
+        (lat1, lon1), (lat2, lon2) = config["bbox"]
+        for _ in range(vessels_per_region):
+            fleet.append(
+                (
+                    rng.randrange(200000000, 800000000),
+                    rng.uniform(min(lat1, lat2), max(lat1, lat2)),
+                    rng.uniform(min(lon1, lon2), max(lon1, lon2)),
+                    rng.choice([0, 0, 1, 1, 5, 8]),
+                )
+            )
+
+    started = 1_700_000_000.0
+    with AISLogWriter(path) as writer:
+        for index in range(num_frames):
+            mmsi, lat, lon, status = rng.choice(fleet)
+            sog = 0.0 if status in (1, 5) else rng.uniform(2, 16)
+            frame = {
+                "Message": {
+                    "PositionReport": {
+                        "Cog": rng.uniform(0, 360),
+                        "Latitude": lat,
+                        "Longitude": lon,
+                        "NavigationalStatus": status,
+                        "Sog": sog,
+                        "UserID": mmsi,
+                    }
+                },
+                "MessageType": "PositionReport",
+                "MetaData": {"MMSI": mmsi, "time_utc": "2024-01-15 10:30:00.000000000 +0000 UTC"},
+            }
+            writer.write(started + index * 0.01, json.dumps(frame, separators=(",", ":")))
+
+
+async def run(log_path: str, speed: float) -> dict:
+    """Replay the log into a fresh daemon and collect results."""
+    frames = list(read_ais_log(log_path))
+    server = AISReplayServer(frames, speed=speed)
+    await server.start(port=0)
+
+    daemon = AISIngestionDaemon()
+    daemon.ws_url = server.url
+    try:
+        started = time.perf_counter()
+        await daemon._consume()
+        elapsed = time.perf_counter() - started
+    finally:
+        await daemon.stop()
+        await server.stop()
+
+    port_agent = PortAgent()
+    regions = {}
+    for zone in daemon.index.zones:
+        stats = daemon.table.get_port_stats(zone.index, daemon.feed_now())
+        stats["severity"] = port_agent._calculate_severity_from_vessels(
+            stats["vessel_count"], stats["stationary_count"]
+        )
+        regions[zone.name] = stats
+
+    return {
+        "frames": len(frames),
+        "speed": speed or "max",
+        "seconds": round(elapsed, 3),
+        "frames_per_second": round(len(frames) / elapsed),
+        "position_reports": daemon.get_metrics()["position_reports_total"],
+        "decode_executor": daemon.settings.ais_decode_executor,
+        "queue": daemon.queue.get_metrics(),
+        "regions": regions,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--log", help="Recorded log; a synthetic one is generated if omitted")
+    parser.add_argument("--frames", type=int, default=100000, help="Synthetic log size")
+    parser.add_argument("--vessels", type=int, default=60, help="Synthetic vessels per region")
+    parser.add_argument("--speed", type=float, default=0, help="Replay speed, 0 = max")
+    args = parser.parse_args()
+
+    log_path = args.log
+    temp_dir = None
+    if log_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        log_path = os.path.join(temp_dir.name, "synthetic.aislog.gz")
+        write_synthetic_log(log_path, args.frames, args.vessels)
+
+    try:
+        print(json.dumps(asyncio.run(run(log_path, args.speed)), indent=2))
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark port-zone assignment for AIS positions.
+
+Builds a synthetic set of overlapping bounding-box and radius port zones and
+measures how many positions per second the grid index assigns, compared with
+a linear scan over all zones.
+
+Usage:
+    python -m backend.benchmarks.spatial_index [--ports 500] [--messages 200000]
+"""
+
+import argparse
+import random
+import time
+from backend.services.spatial_index import PortSpatialIndex, bbox_zone, radius_zone
+
+
+def build_zones(num_ports: int, seed: int) -> list:
+    """Create a mix of bbox and radius zones clustered along synthetic coastlines."""
+    rng = random.Random(seed)
+    zones = []
+    for index in range(num_ports):
+        lat = rng.uniform(-55, 65)
+        lon = rng.uniform(-180, 175)
+        if index % 2:
+            zones.append(radius_zone(index, f"port-{index}", lat, lon, rng.uniform(10, 60)))
+        else:
+            half = rng.uniform(0.1, 0.5)
+            zones.append(bbox_zone(index, f"port-{index}", [[lat - half, lon - half], [lat + half, lon + half]]))
+    return zones
+
+
+def build_positions(zones: list, count: int, seed: int) -> list[tuple[float, float]]:
+    """Generate positions: 80% near a port, 20% in open sea."""
+    rng = random.Random(seed + 1)
+    positions = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            zone = rng.choice(zones)
+            lat = rng.uniform(zone.min_lat - 0.2, zone.max_lat + 0.2)
+            lon = rng.uniform(zone.min_lon - 0.2, zone.max_lon + 0.2)
+        else:
+            lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        positions.append((lat, lon))
+    return positions
+
+
+def run(num_ports: int, num_messages: int, cell_degrees: float, seed: int = 7) -> dict:
+    """Run the benchmark and return throughput figures."""
+    zones = build_zones(num_ports, seed)
+    positions = build_positions(zones, num_messages, seed)
+
+    started = time.perf_counter()
+    index = PortSpatialIndex(zones, cell_degrees)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [index.lookup(lat, lon) for lat, lon in positions]
+    index_seconds = time.perf_counter() - started
+
+    sample = positions[: max(1, num_messages // 20)]
+    started = time.perf_counter()
+    scanned = [tuple(z.index for z in zones if z.contains(lat, lon)) for lat, lon in sample]
+    scan_seconds = time.perf_counter() - started
+
+    mismatches = sum(
+        1 for got, expected in zip(indexed, scanned) if sorted(got) != sorted(expected)
+    )
+
+    return {
+        "ports": num_ports,
+        "messages": num_messages,
+        **index.stats(),
+        "build_ms": round(build_seconds * 1000, 1),
+        "index_msgs_per_second": round(num_messages / index_seconds),
+        "linear_scan_msgs_per_second": round(len(sample) / scan_seconds),
+        "assigned_fraction": round(sum(1 for ports in indexed if ports) / num_messages, 3),
+        "mismatches_vs_scan": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ports", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--cell-degrees", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for key, value in run(args.ports, args.messages, args.cell_degrees).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
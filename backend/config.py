@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -9,8 +10,150 @@ class Settings(BaseSettings):
     news_api_key: str = ""
     openweather_api_key: str = ""
     aisstream_api_key: str = ""
+    # Point at a local replay server (python -m backend.tools.ais_replay) for
+    # offline runs and benchmarks
+    aisstream_url: str = "wss://stream.aisstream.io/v0/stream"
     backend_url: str = "http://localhost:8000"
 
+    # Per-agent deadlines (seconds) for the concurrent data-gathering stage.
+    # A source that misses its deadline is reported as degraded instead of
+    # failing the whole analysis.
+    news_agent_timeout: float = 20.0
+    weather_agent_timeout: float = 15.0
+    port_agent_timeout: float = 40.0
+
+    # Shared HTTP connection pool for the news and weather APIs. HTTP/2
+    # needs the optional "h2" package (pip install "httpx[http2]").
+    http2_enabled: bool = False
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_max_connections_per_host: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 10.0
+
+    # Weather responses are cached per endpoint and coordinates (rounded to
+    # weather_cache_precision decimal places). Entries older than the TTL
+    # are still served for weather_cache_stale_seconds while being refreshed
+    # in the background. Scheduled refreshes bypass the cache (and refill it).
+    weather_cache_ttl_seconds: float = 600.0
+    weather_cache_stale_seconds: float = 3600.0
+    weather_cache_max_entries: int = 1024
+    weather_cache_precision: int = 2
+
+    # OpenWeatherMap request rate (token bucket) and the number of locations
+    # fetched at once by the bulk weather API
+    weather_rate_limit_per_second: float = 1.0
+    weather_rate_limit_burst: int = 10
+    weather_bulk_concurrency: int = 10
+
+    # Upstream API limits (see backend/services/rate_limit.py). Each upstream
+    # has a token bucket and a daily quota (0 = unlimited). Background calls
+    # (the refresh scheduler) queue behind interactive ones and may not use
+    # the last upstream_interactive_reserve share of a quota; queued calls
+    # fail after their priority's timeout, or after half the time left
+    # before their agent's deadline if that is sooner (so agent runs use
+    # the timeouts only as caps). Calls answered with HTTP 429 are
+    # retried up to upstream_max_retries times after the upstream's
+    # Retry-After (default upstream_retry_after_seconds). Rates are per
+    # process; with the sqlite state backend, daily quotas are counted in
+    # state_db_path and shared by all workers.
+    news_rate_limit_per_second: float = 1.0
+    news_rate_limit_burst: int = 5
+    news_daily_quota: int = 100
+    weather_daily_quota: int = 1000
+    openai_rate_limit_per_second: float = 5.0
+    openai_rate_limit_burst: int = 10
+    openai_daily_quota: int = 0
+    ais_connect_rate_limit_per_second: float = 0.1
+    ais_connect_rate_limit_burst: int = 3
+    upstream_interactive_reserve: float = 0.2
+    upstream_interactive_timeout_seconds: float = 10.0
+    upstream_background_timeout_seconds: float = 120.0
+    upstream_max_retries: int = 1
+    upstream_retry_after_seconds: float = 5.0
+
+    # Rolling window of recent articles kept per region, and the number of
+    # article URLs / content hashes remembered for deduplication
+    news_window_size: int = 50
+    news_window_max_age_hours: float = 72.0
+    news_seen_max_entries: int = 10000
+    # Local keyword pre-filter: articles scoring below the threshold are
+    # never sent to the LLM (see backend/agents/news_relevance.py)
+    news_relevance_filter_enabled: bool = True
+    news_relevance_threshold: float = 4.0
+    # "per_region" sends one NewsAPI query per region; "combined" sends a few
+    # broad queries covering every region (at most once per
+    # news_combined_min_interval_seconds) and routes articles to regions
+    # by the region, port and alias names they mention
+    news_fetch_mode: Literal["per_region", "combined"] = "per_region"
+    news_combined_min_interval_seconds: float = 300.0
+    # On-disk cache of LLM news classifications (empty path disables it)
+    llm_cache_path: str = "chainwatch_llm_cache.db"
+    llm_cache_max_entries: int = 5000
+    # Regions classified per LLM call by batched news classification (larger
+    # batches send the instructions fewer times but take longer; 1 disables)
+    llm_batch_size: int = 5
+
+    # Background refresh of every region. Intervals are per data source in
+    # seconds; 0 re-runs a source as soon as it finishes and a negative value
+    # disables it. Port data is ingested continuously by the AIS daemon, so
+    # its interval only controls how often the region state is recomposed.
+    # The news interval is a minimum: it is stretched when needed so the
+    # background share of news_daily_quota lasts until midnight UTC.
+    # /analyze serves the precomputed state while it is younger than
+    # analysis_max_age_seconds.
+    refresh_enabled: bool = True
+    refresh_intervals: dict = {
+        "weather": 600,
+        "news": 1800,
+        "port": 60,
+    }
+    refresh_jitter_seconds: float = 15.0
+    refresh_max_concurrency: int = 3
+    # Lock file electing the one worker process that runs the refresh jobs
+    scheduler_lock_path: str = "chainwatch_scheduler.lock"
+    analysis_max_age_seconds: float = 900.0
+
+    # Long-lived AIS ingestion: one subscription for all regions feeding a
+    # live vessel table. Port congestion is read from the table once the
+    # connection has been up for the warm-up period; vessels silent for
+    # longer than the TTL are dropped.
+    ais_daemon_enabled: bool = True
+    ais_daemon_warmup_seconds: float = 30.0
+    ais_vessel_ttl_seconds: float = 600.0
+    # Cell size of the grid index mapping positions to port zones. A region
+    # may set "radius_km" to use a circular zone instead of its "bbox".
+    ais_grid_cell_degrees: float = 0.5
+    # On-demand port sampling (used when the daemon is off or still warming
+    # up) stops once the estimated vessel count is within the tolerance of
+    # the observed count, but never before the minimum or after the maximum.
+    ais_sample_min_seconds: float = 5.0
+    ais_sample_max_seconds: float = 30.0
+    ais_sample_tolerance: float = 0.05
+    # Completed anchorage waits kept per port for the median/p90 waiting time,
+    # and the number needed before they replace the congestion-based estimate
+    ais_wait_window_size: int = 500
+    ais_min_completed_waits: int = 20
+    # Frames waiting between the ingestion reader and processor. When full,
+    # "conflate" keeps only the latest frame per vessel (dropping the oldest
+    # for new vessels) and "drop" discards the oldest frames. Decoding runs
+    # "inline" on the event loop, in a worker "thread" or in a worker "process".
+    ais_queue_size: int = 10000
+    ais_overflow_policy: Literal["conflate", "drop"] = "conflate"
+    ais_decode_executor: Literal["inline", "thread", "process"] = "inline"
+
+    # Number of past SystemState snapshots kept per region
+    state_history_size: int = 2016
+
+    # State backend: "sqlite" persists snapshots to a WAL-mode log that is
+    # shared by all worker processes on the host; "memory" keeps state
+    # private to the process. An empty state_db_path also disables the log.
+    state_backend: Literal["memory", "sqlite"] = "sqlite"
+    state_db_path: str = "chainwatch_state.db"
+    state_retention_days: float = 30.0
+    state_db_max_rows_per_region: int = 20000
+
     # Demo regions with coordinates and port bounding boxes
     # Bounding boxes are approximately 50km radius around major ports
     regions: dict = {
@@ -18,18 +161,21 @@ class Settings(BaseSettings):
             "lat": 31.2304,
             "lon": 121.4737,
             "port": "Shanghai Port",
+            "aliases": ["Yangshan", "Waigaoqiao"],
             "bbox": [[30.9, 121.2], [31.5, 122.0]]  # ~50km radius
         },
         "Rotterdam": {
             "lat": 51.9225,
             "lon": 4.4792,
             "port": "Port of Rotterdam",
+            "aliases": ["Maasvlakte", "Europoort"],
             "bbox": [[51.7, 4.2], [52.1, 4.8]]  # ~50km radius
         },
         "Los Angeles": {
             "lat": 33.7405,
             "lon": -118.2760,
             "port": "Port of Los Angeles",
+            "aliases": ["San Pedro Bay", "Port of Long Beach"],
             "bbox": [[33.5, -118.5], [33.9, -118.0]]  # ~50km radius
         },
     }
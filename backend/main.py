@@ -1,12 +1,23 @@
+import json
+import time
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
 
-from backend.orchestrator import Orchestrator
+from backend.orchestrator import Orchestrator, RefreshScheduler
 from backend.state import state_store
 from backend.config import get_settings
 from backend.models.schemas import SystemState, ChatRequest, ChatResponse
-from backend.services.llm_service import LLMService
+from backend.services.llm_service import NO_STATE_ANSWER, LLMService, stream_metrics
+from backend.services.ais_ingest import ais_daemon
+from backend.services.http_pool import http_pool
+from backend.services.classification_cache import classification_cache
+from backend.services.quota_store import quota_store
+from backend.services.rate_limit import upstream_limiters
+from backend.services.weather_api import weather_cache
 
 
 @asynccontextmanager
@@ -14,9 +25,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     print("ChainWatch API starting up...")
+    # The scheduler leader also runs AIS ingestion, so only one worker
+    # holds the upstream connection
+    if settings.refresh_enabled or settings.ais_daemon_enabled:
+        scheduler.start()
     yield
     # Shutdown
     print("ChainWatch API shutting down...")
+    await scheduler.stop()
+    await weather_cache.close()
+    await http_pool.close()
+    classification_cache.close()
+    if quota_store is not None:
+        quota_store.close()
+    state_store.close()
 
 
 app = FastAPI(
@@ -37,6 +59,7 @@ app.add_middleware(
 
 # Initialize services
 orchestrator = Orchestrator()
+scheduler = RefreshScheduler(orchestrator)
 llm_service = LLMService()
 settings = get_settings()
 
@@ -56,13 +79,44 @@ async def get_regions():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Get runtime counters for the analysis pipeline."""
+    return {
+        "coalescing": orchestrator.get_coalescing_stats(),
+        "ais": ais_daemon.get_metrics(),
+        "http_pool": http_pool.get_stats(),
+        "weather_cache": weather_cache.get_stats(),
+        "upstream_limits": {
+            name: limiter.get_stats() for name, limiter in upstream_limiters.items()
+        },
+        "news": orchestrator.news_agent.get_stats(),
+        "llm_classification_cache": classification_cache.get_stats(),
+        "llm_streaming": stream_metrics.get_stats(),
+    }
+
+
+@app.get("/schedule")
+async def get_schedule():
+    """Get the background refresh schedule and last-run times."""
+    schedule = scheduler.get_schedule()
+    for job in schedule["jobs"]:
+        fetched_at = orchestrator.get_component_times(job["region"]).get(job["source"])
+        job["last_success"] = fetched_at.isoformat() if fetched_at else None
+    return schedule
+
+
 @app.post("/analyze/{region}", response_model=SystemState)
-async def analyze_region(region: str):
+async def analyze_region(region: str, force: bool = False):
     """
     Run full risk analysis for a region.
 
+    Returns the precomputed state when the background scheduler has one
+    younger than ``analysis_max_age_seconds``, unless ``force`` is set.
+
     Args:
         region: Region name (Shanghai, Rotterdam, Los Angeles)
+        force: Always run the pipeline instead of serving a cached state
 
     Returns:
         Complete system state with all risk assessments
@@ -73,7 +127,12 @@ async def analyze_region(region: str):
             detail=f"Invalid region: {region}. Valid options: {list(settings.regions.keys())}",
         )
 
-    result = await orchestrator.analyze(region)
+    if not force:
+        cached = orchestrator.get_fresh_state(region, settings.analysis_max_age_seconds)
+        if cached is not None:
+            return cached
+
+    result = await orchestrator.analyze(region, force=force)
 
     if result.status == "error":
         raise HTTPException(status_code=500, detail=result.error_message)
@@ -82,48 +141,67 @@ async def analyze_region(region: str):
 
 
 @app.get("/state", response_model=SystemState | None)
-async def get_current_state():
-    """Get the current system state from the last analysis."""
-    state = state_store.get()
+async def get_current_state(region: Optional[str] = None):
+    """Get the latest system state for a region (default: the most recently analyzed region)."""
+    state = state_store.get(region)
     if not state:
         return None
     return state
 
 
 @app.get("/state/summary")
-async def get_state_summary():
-    """Get a summary of the current state."""
-    state = state_store.get()
+async def get_state_summary(region: Optional[str] = None):
+    """Get a summary of the latest state for a region (default: most recent)."""
+    state = state_store.get(region)
     if not state:
         return {"status": "no_data", "message": "No analysis has been run yet."}
 
     return {
         "status": "ok",
         "region": state.region,
-        "risk_level": state.aggregated_risk.get("risk_level") if state.aggregated_risk else None,
-        "risk_score": state.aggregated_risk.get("risk_score") if state.aggregated_risk else None,
-        "last_updated": state_store.get_last_updated(),
+        "risk_level": state.aggregated_risk.risk_level if state.aggregated_risk else None,
+        "risk_score": state.aggregated_risk.risk_score if state.aggregated_risk else None,
+        "last_updated": state_store.get_last_updated(state.region),
     }
 
 
+@app.get("/state/history/{region}", response_model=list[SystemState])
+async def get_state_history(region: str, hours: float = 24.0):
+    """
+    Get past system states for a region.
+
+    Args:
+        region: Region name
+        hours: How far back to look (default: 24 hours)
+
+    Returns:
+        Snapshots within the window, oldest first
+    """
+    if region not in settings.regions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid region: {region}. Valid options: {list(settings.regions.keys())}",
+        )
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return state_store.get_history(region, since=since)
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     Chat endpoint for asking questions about the current risk assessment.
 
     Args:
-        request: ChatRequest with user message
+        request: ChatRequest with user message and optional region
 
     Returns:
-        AI-generated response based on current system state
+        AI-generated response based on the region's latest system state
     """
-    state = state_store.get()
+    state = state_store.get(request.region)
 
     if not state:
-        return ChatResponse(
-            response="No risk assessment data is available. Please run an analysis first by selecting a region.",
-            based_on_data=False,
-        )
+        return ChatResponse(response=NO_STATE_ANSWER, based_on_data=False)
 
     # Convert state to dict for LLM
     state_dict = state.model_dump() if state else None
@@ -136,6 +214,100 @@ async def chat(request: ChatRequest):
     return ChatResponse(response=response, based_on_data=True)
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_stream(fragments: AsyncIterator[str], **done: object) -> AsyncIterator[str]:
+    """
+    Forward text fragments as SSE "token" events.
+
+    Ends with a "done" event carrying the time to first token and total
+    duration in milliseconds (plus ``done``), or an "error" event if the
+    stream fails.
+    """
+    started = time.monotonic()
+    ttft_ms = None
+    try:
+        async for text in fragments:
+            if ttft_ms is None:
+                ttft_ms = round((time.monotonic() - started) * 1000, 1)
+            yield _sse("token", {"text": text})
+    except Exception as e:
+        yield _sse("error", {"message": str(e)})
+        return
+    yield _sse(
+        "done",
+        {
+            **done,
+            "ttft_ms": ttft_ms,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+        },
+    )
+
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+
+    Emits "token" events ({"text": ...}) as the answer is generated, then a
+    "done" event with based_on_data and time-to-first-token measurements,
+    or an "error" event.
+
+    Args:
+        request: ChatRequest with user message and optional region
+    """
+    state = state_store.get(request.region)
+    fragments = llm_service.stream_chat_answer(
+        question=request.message,
+        system_state=state.model_dump() if state else None,
+    )
+    return StreamingResponse(
+        _sse_stream(fragments, based_on_data=state is not None),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
+@app.get("/explain/{region}/stream")
+async def explain_stream(region: str):
+    """
+    Stream a fresh explanation of a region's latest state using Server-Sent Events.
+
+    Emits "token" events as the explanation is generated, then a "done"
+    event with time-to-first-token measurements, or an "error" event.
+
+    Args:
+        region: Region name
+    """
+    if region not in settings.regions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid region: {region}. Valid options: {list(settings.regions.keys())}",
+        )
+    state = state_store.get(region)
+    if not state:
+        raise HTTPException(status_code=404, detail=f"No analysis available for {region}")
+
+    fragments = orchestrator.explanation_agent.stream(
+        region=region,
+        news_risk=state.news_risk,
+        weather_risk=state.weather_risk,
+        port_risk=state.port_risk,
+        aggregated_risk=state.aggregated_risk,
+    )
+    return StreamingResponse(
+        _sse_stream(fragments, region=region),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -23,6 +23,12 @@ class WeatherRiskOutput(BaseModel):
     temperature_c: Optional[float] = Field(default=None, description="Temperature in Celsius")
     wind_speed_kmh: Optional[float] = Field(default=None, description="Wind speed in km/h")
     rainfall_mm: Optional[float] = Field(default=None, description="Rainfall in mm")
+    severity_timeline: Optional[list[dict]] = Field(
+        default=None, description="Forecast severity per 3-hour slot over the full horizon"
+    )
+    worst_window: Optional[dict] = Field(
+        default=None, description="24-hour forecast window with the highest mean severity"
+    )
 
 
 class PortRiskOutput(BaseModel):
@@ -35,6 +41,9 @@ class PortRiskOutput(BaseModel):
     details: str = Field(description="Details about port congestion and delays")
     vessel_queue: Optional[int] = Field(default=None, description="Number of vessels waiting")
     avg_delay_hours: Optional[float] = Field(default=None, description="Average delay in hours")
+    confidence: Optional[float] = Field(
+        default=None, ge=0, le=1, description="Estimated share of vessels in the area that were observed"
+    )
 
 
 class AggregatedRisk(BaseModel):
@@ -60,6 +69,10 @@ class SystemState(BaseModel):
     explanation: Optional[str] = None
     status: Literal["pending", "processing", "completed", "error"] = "pending"
     error_message: Optional[str] = None
+    degraded_components: list[str] = Field(
+        default_factory=list,
+        description="Risk components (news, weather, port) that failed or timed out",
+    )
 
 
 class ChatRequest(BaseModel):
@@ -1,3 +1,4 @@
 from backend.orchestrator.orchestrator import Orchestrator
+from backend.orchestrator.scheduler import RefreshScheduler
 
-__all__ = ["Orchestrator"]
+__all__ = ["Orchestrator", "RefreshScheduler"]
@@ -1,4 +1,6 @@
+import asyncio
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
 from backend.agents.news_agent import NewsAgent
 from backend.agents.weather_agent import WeatherAgent
 from backend.agents.port_agent import PortAgent
@@ -7,11 +9,15 @@ from backend.agents.explanation_agent import ExplanationAgent
 from backend.models.schemas import SystemState
 from backend.state import state_store
 from backend.config import get_settings
+from backend.services.rate_limit import use_deadline
 
 
 class Orchestrator:
     """Central orchestrator that coordinates all risk assessment agents."""
 
+    # Data-gathering components that can be refreshed independently
+    SOURCES = ("news", "weather", "port")
+
     def __init__(self):
         self.settings = get_settings()
         self.news_agent = NewsAgent()
@@ -20,71 +26,285 @@ class Orchestrator:
         self.aggregation_agent = AggregationAgent()
         self.explanation_agent = ExplanationAgent()
 
+        # Single-flight registry: region -> in-flight pipeline run
+        self._inflight: dict[tuple[str, bool], asyncio.Task] = {}
+        self._coalescing_stats = {
+            "requests": 0,
+            "pipeline_runs": 0,
+            "coalesced_requests": 0,
+        }
+
+        # Latest output per region and source: (result, fetched_at)
+        self._components: dict[str, dict[str, tuple[Any, datetime]]] = {}
+        self._inflight_components: dict[tuple[str, str, bool], asyncio.Task] = {}
+        # Last explanation per region, keyed by the inputs it was built from
+        self._explanations: dict[str, tuple[tuple, str]] = {}
+        # Whether another worker (the scheduler leader) runs AIS ingestion;
+        # set by the RefreshScheduler
+        self.ingestion_elsewhere: Callable[[], bool] = lambda: False
+
+        self._seed_components()
+
+    def _seed_components(self) -> None:
+        """
+        Seed the cached source outputs from states restored at startup.
+
+        After a warm start from the snapshot log, the first refresh of one
+        source recomposes the region from the other sources' restored
+        outputs instead of publishing a state with them missing.
+        """
+        for region in self.settings.regions:
+            state = state_store.get(region)
+            if state is None or state.status != "completed":
+                continue
+            outputs = {
+                "news": state.news_risk,
+                "weather": state.weather_risk,
+                "port": state.port_risk,
+            }
+            cached = {
+                source: (output, state.timestamp)
+                for source, output in outputs.items()
+                if output is not None
+            }
+            if cached:
+                self._components[region] = cached
+
     def _validate_region(self, region: str) -> bool:
         """Check if region is valid."""
         return region in self.settings.regions
 
-    async def analyze(self, region: str) -> SystemState:
+    async def _run_with_deadline(
+        self, component: str, coro: Awaitable[Any], timeout: float
+    ) -> Optional[Any]:
         """
-        Run full risk analysis pipeline for a region.
+        Await an agent run, giving up after its deadline.
 
-        Execution order:
-        1. News Risk Agent
-        2. Weather Risk Agent
-        3. Port Risk Agent
-        4. Risk Aggregation Agent
-        5. Explanation Agent
+        Upstream calls made by the agent queue for rate-limited capacity for
+        at most half of the time left before the deadline.
 
         Args:
-            region: Region to analyze (e.g., "Shanghai")
+            component: Component name used in logs (news, weather, port)
+            coro: Agent coroutine to await
+            timeout: Deadline in seconds
 
         Returns:
-            Complete SystemState with all agent outputs
+            The agent output, or None if the agent timed out or raised
+        """
+        try:
+            with use_deadline(timeout):
+                return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"[Orchestrator] {component} agent timed out after {timeout}s")
+        except Exception as e:
+            print(f"[Orchestrator] {component} agent failed: {str(e)}")
+        return None
+
+    async def _run_port(self, region: str, allow_shared: bool = False) -> Optional[Any]:
+        """
+        Assess port congestion, deferring to the worker that ingests AIS.
+
+        AIS ingestion runs only in the scheduler leader. With
+        ``allow_shared``, other workers reuse the port output the leader
+        published to the shared snapshot log instead of opening their own
+        AIS connection; without a recent one they run the port agent
+        (on-demand sampling) themselves.
+        """
+        if allow_shared and state_store.log is not None and self.ingestion_elsewhere():
+            state = self.get_fresh_state(region, self.settings.analysis_max_age_seconds)
+            if (
+                state is not None
+                and state.port_risk is not None
+                and "port" not in state.degraded_components
+            ):
+                return state.port_risk
+        return await self.port_agent.run(region)
+
+    def _start_component(
+        self, region: str, source: str, allow_shared: bool = False
+    ) -> Awaitable[Any]:
+        """Build the deadline-bounded agent run for one source."""
+        if source == "port":
+            return self._run_with_deadline(
+                source, self._run_port(region, allow_shared), self.settings.port_agent_timeout
+            )
+        agent, timeout = {
+            "news": (self.news_agent, self.settings.news_agent_timeout),
+            "weather": (self.weather_agent, self.settings.weather_agent_timeout),
+        }[source]
+        return self._run_with_deadline(source, agent.run(region), timeout)
+
+    async def refresh_component(
+        self, region: str, source: str, allow_shared: bool = False
+    ) -> Optional[Any]:
+        """
+        Re-run a single data-gathering agent and cache its output.
+
+        Concurrent refreshes of the same region and source share one run.
+
+        Args:
+            region: Region to refresh
+            source: One of "news", "weather", "port"
+            allow_shared: Allow reusing the port output published by the
+                worker that runs AIS ingestion (never for forced or
+                scheduled refreshes)
+
+        Returns:
+            The fresh agent output, or None if the agent failed or timed out
+        """
+        key = (region, source, allow_shared)
+        task = self._inflight_components.get(key)
+        if task is None:
+            task = asyncio.create_task(self._start_component(region, source, allow_shared))
+            self._inflight_components[key] = task
+            task.add_done_callback(lambda _: self._inflight_components.pop(key, None))
+
+        result = await asyncio.shield(task)
+        if result is not None:
+            self._components.setdefault(region, {})[source] = (result, datetime.utcnow())
+        return result
+
+    async def refresh_news(self, regions: list[str]) -> dict[str, Optional[Any]]:
+        """
+        Re-run the news agent for several regions and cache the outputs.
+
+        Regions needing a new LLM classification share batched LLM calls.
+        The news deadline applies to each region's fetch and to the batched
+        classification separately, so one slow region does not cost the
+        others their results.
+
+        Args:
+            regions: Regions to refresh
+
+        Returns:
+            Region name -> fresh news output, or None if it failed or timed out
+        """
+        timeout = self.settings.news_agent_timeout
+        # Outer guard covering both stages (fetch, then classification)
+        results = await self._run_with_deadline(
+            "news", self.news_agent.run_batch(regions, timeout=timeout), 2 * timeout
+        ) or {}
+        fetched_at = datetime.utcnow()
+        for region, result in results.items():
+            self._components.setdefault(region, {})["news"] = (result, fetched_at)
+        return {region: results.get(region) for region in regions}
+
+    async def refresh_weather(self, regions: list[str]) -> dict[str, Optional[Any]]:
+        """
+        Re-run the weather agent for several regions and cache the outputs.
+
+        Locations are fetched concurrently and all forecasts are scored in
+        one pass. Regions whose weather misses the deadline are left out; the
+        others keep their fresh results.
+
+        Args:
+            regions: Regions to refresh
+
+        Returns:
+            Region name -> fresh weather output, or None if it failed or timed out
+        """
+        timeout = self.settings.weather_agent_timeout
+        # Outer guard in case scoring overruns after the fetch deadline
+        results = await self._run_with_deadline(
+            "weather", self.weather_agent.run_batch(regions, timeout=timeout), 2 * timeout
+        ) or {}
+        fetched_at = datetime.utcnow()
+        for region, result in results.items():
+            self._components.setdefault(region, {})["weather"] = (result, fetched_at)
+        return {region: results.get(region) for region in regions}
+
+    def get_component_times(self, region: str) -> dict[str, datetime]:
+        """Get when each cached source for a region was last refreshed."""
+        return {
+            source: fetched_at
+            for source, (_, fetched_at) in self._components.get(region, {}).items()
+        }
+
+    def get_fresh_state(self, region: str, max_age_seconds: float) -> Optional[SystemState]:
+        """
+        Get the latest composed state for a region if it is recent enough.
+
+        Args:
+            region: Region name
+            max_age_seconds: Maximum acceptable age of the state
+
+        Returns:
+            The cached SystemState, or None if missing, stale or failed
+        """
+        state = state_store.get(region)
+        if state is None or state.status != "completed":
+            return None
+        age = (datetime.utcnow() - state.timestamp).total_seconds()
+        return state if age <= max_age_seconds else None
+
+    async def compose(
+        self, region: str, degraded: Optional[list[str]] = None
+    ) -> SystemState:
+        """
+        Build a SystemState from the cached source outputs for a region.
+
+        Runs aggregation and, when a material input (event type, condition,
+        congestion level or any severity) changed since the last
+        composition, the explanation agent.
+
+        Args:
+            region: Region to compose
+            degraded: Sources to report as degraded; defaults to the sources
+                that have no cached output
+
+        Returns:
+            Completed SystemState, also published to the state store
         """
-        # Initialize state
         state = SystemState(
             region=region,
             timestamp=datetime.utcnow(),
             status="processing",
         )
 
-        # Validate region
-        if not self._validate_region(region):
-            state.status = "error"
-            state.error_message = f"Unknown region: {region}. Valid regions: {list(self.settings.regions.keys())}"
-            state_store.update(state)
-            return state
-
         try:
-            # Step 1: News Risk Agent
-            news_result = await self.news_agent.run(region)
-            state.news_risk = news_result
+            cached = self._components.get(region, {})
+            news_result = cached.get("news", (None, None))[0]
+            weather_result = cached.get("weather", (None, None))[0]
+            port_result = cached.get("port", (None, None))[0]
 
-            # Step 2: Weather Risk Agent
-            weather_result = await self.weather_agent.run(region)
+            state.news_risk = news_result
             state.weather_risk = weather_result
-
-            # Step 3: Port Risk Agent
-            port_result = await self.port_agent.run(region)
             state.port_risk = port_result
+            if degraded is None:
+                degraded = [source for source in self.SOURCES if source not in cached]
+            state.degraded_components = degraded
 
-            # Step 4: Risk Aggregation Agent
+            # Risk Aggregation Agent
             aggregation_result = await self.aggregation_agent.run(
                 region=region,
-                news_severity=news_result.severity,
-                weather_severity=weather_result.severity,
-                port_severity=port_result.severity,
+                news_severity=news_result.severity if news_result else 1,
+                weather_severity=weather_result.severity if weather_result else 1,
+                port_severity=port_result.severity if port_result else 1,
             )
             state.aggregated_risk = aggregation_result
 
-            # Step 5: Explanation Agent
-            explanation = await self.explanation_agent.run(
-                region=region,
-                news_risk=news_result,
-                weather_risk=weather_result,
-                port_risk=port_result,
-                aggregated_risk=aggregation_result,
+            # Explanation Agent, skipped when no material input has changed
+            explanation_key = (
+                (news_result.event_type, news_result.severity, news_result.summary)
+                if news_result else None,
+                (weather_result.weather_condition, weather_result.severity)
+                if weather_result else None,
+                (port_result.congestion_level, port_result.severity)
+                if port_result else None,
+                (aggregation_result.risk_level, aggregation_result.risk_score),
             )
+            previous = self._explanations.get(region)
+            if previous is not None and previous[0] == explanation_key:
+                explanation = previous[1]
+            else:
+                explanation = await self.explanation_agent.run(
+                    region=region,
+                    news_risk=news_result,
+                    weather_risk=weather_result,
+                    port_risk=port_result,
+                    aggregated_risk=aggregation_result,
+                )
+                self._explanations[region] = (explanation_key, explanation)
             state.explanation = explanation
 
             # Mark as completed
@@ -99,6 +319,89 @@ class Orchestrator:
 
         return state
 
+    async def analyze(self, region: str, force: bool = False) -> SystemState:
+        """
+        Run full risk analysis for a region, coalescing concurrent callers.
+
+        If a pipeline run for the region is already in flight, the caller
+        awaits that run and shares its SystemState instead of starting a
+        duplicate one. Cancelling one caller never cancels the shared run.
+        Forced runs only coalesce with other forced runs.
+
+        Args:
+            region: Region to analyze (e.g., "Shanghai")
+            force: Re-run every agent, never reusing the port output
+                published by another worker
+
+        Returns:
+            Complete SystemState with all agent outputs
+        """
+        self._coalescing_stats["requests"] += 1
+
+        key = (region, force)
+        task = self._inflight.get(key)
+        if task is None:
+            self._coalescing_stats["pipeline_runs"] += 1
+            task = asyncio.create_task(self._run_pipeline(region, force))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._coalescing_stats["coalesced_requests"] += 1
+
+        return await asyncio.shield(task)
+
+    def get_coalescing_stats(self) -> dict:
+        """Get single-flight counters for /analyze requests."""
+        stats = dict(self._coalescing_stats)
+        stats["in_flight"] = sorted({region for region, _ in self._inflight})
+        return stats
+
+    async def _run_pipeline(self, region: str, force: bool = False) -> SystemState:
+        """
+        Run full risk analysis pipeline for a region.
+
+        Execution order:
+        1. News, Weather and Port Risk Agents (concurrently, each with its
+           own deadline)
+        2. Risk Aggregation Agent
+        3. Explanation Agent
+
+        Components that fail or miss their deadline are listed in
+        ``degraded_components``. Their previous output is reused if one is
+        cached; otherwise they are left empty and contribute the minimum
+        severity to the aggregate score.
+
+        Args:
+            region: Region to analyze (e.g., "Shanghai")
+            force: Never reuse the port output published by another worker
+
+        Returns:
+            Complete SystemState with all agent outputs
+        """
+        # Validate region
+        if not self._validate_region(region):
+            state = SystemState(
+                region=region,
+                timestamp=datetime.utcnow(),
+                status="error",
+                error_message=f"Unknown region: {region}. Valid regions: {list(self.settings.regions.keys())}",
+            )
+            return state
+
+        # Step 1: News, Weather and Port Risk Agents run concurrently
+        results = await asyncio.gather(
+            *(
+                self.refresh_component(region, source, allow_shared=not force)
+                for source in self.SOURCES
+            )
+        )
+        degraded = [
+            source for source, result in zip(self.SOURCES, results) if result is None
+        ]
+
+        # Steps 2-3: Aggregation and Explanation
+        return await self.compose(region, degraded=degraded)
+
     def get_available_regions(self) -> list[str]:
         """Get list of available regions for analysis."""
         return list(self.settings.regions.keys())
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from backend.config import get_settings
+from backend.services.ais_ingest import ais_daemon
+from backend.services.rate_limit import BACKGROUND, upstream_limiters, use_priority
+from backend.services.swr_cache import bypass_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+@dataclass
+class RefreshJob:
+    """Refresh schedule for one region and data source."""
+
+    region: str
+    source: str
+    interval_seconds: float
+    next_run: float = 0.0
+    last_run: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_ok: Optional[bool] = None
+    runs: int = 0
+    running: bool = False
+
+    def to_dict(self) -> dict:
+        """Serialize the job for the /schedule endpoint."""
+        return {
+            "region": self.region,
+            "source": self.source,
+            "interval_seconds": self.interval_seconds,
+            "next_run_in_seconds": max(0.0, round(self.next_run - time.monotonic(), 1)),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_ok": self.last_ok,
+            "runs": self.runs,
+            "running": self.running,
+        }
+
+
+class RefreshScheduler:
+    """
+    Background scheduler that keeps every configured region warm.
+
+    Each (region, source) pair is refreshed on its own cadence from
+    ``Settings.refresh_intervals``. After a source is refreshed the region's
+    SystemState is recomposed, so /analyze and /state can serve precomputed
+    results. Runs are jittered to avoid bursts against upstream APIs and
+    bounded by ``Settings.refresh_max_concurrency``. Upstream calls made by
+    refresh jobs run at background priority, behind interactive requests,
+    and bypass the weather cache so every refresh publishes new data.
+    News jobs that come due close together are refreshed as one batch so
+    their LLM classifications share calls (``Settings.llm_batch_size``);
+    weather jobs are batched the same way so their forecasts are fetched
+    together and scored in one pass.
+    News intervals are stretched when needed so the NewsAPI quota left to
+    background calls lasts until it resets.
+
+    When several worker processes run the API, only the one holding the
+    lock file at ``Settings.scheduler_lock_path`` runs the jobs and the AIS
+    ingestion daemon (``Settings.ais_daemon_enabled``); the others keep
+    retrying so a new leader takes over if it exits.
+    """
+
+    # Poll period of the scheduling loop
+    TICK_SECONDS = 1.0
+    # How often a follower retries to become the leader
+    LEADER_RETRY_SECONDS = 10.0
+
+    def __init__(self, orchestrator):
+        self.settings = get_settings()
+        self.orchestrator = orchestrator
+        self.jobs: list[RefreshJob] = []
+        self._task: Optional[asyncio.Task] = None
+        self._running_tasks: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max(1, self.settings.refresh_max_concurrency))
+        self._lock_file = None
+        self.is_leader = False
+        # Lets the orchestrator reuse port output published by the leader
+        orchestrator.ingestion_elsewhere = self.ingestion_elsewhere
+
+    def _jitter(self) -> float:
+        """Random offset in [-jitter, +jitter] seconds."""
+        jitter = self.settings.refresh_jitter_seconds
+        return random.uniform(-jitter, jitter) if jitter > 0 else 0.0
+
+    def _build_jobs(self) -> list[RefreshJob]:
+        """Create one job per region and source, staggered over the jitter window."""
+        now = time.monotonic()
+        jitter = max(0.0, self.settings.refresh_jitter_seconds)
+        jobs = []
+        for region in self.settings.regions:
+            for source in self.orchestrator.SOURCES:
+                interval = self.settings.refresh_intervals.get(source)
+                if interval is None or interval < 0:
+                    continue
+                jobs.append(
+                    RefreshJob(
+                        region=region,
+                        source=source,
+                        interval_seconds=float(interval),
+                        next_run=now + random.uniform(0, jitter),
+                    )
+                )
+        return jobs
+
+    def _interval(self, job: RefreshJob) -> float:
+        """
+        The job's interval, stretched for news to fit the remaining quota.
+
+        A round of news refreshes costs one NewsAPI call per region in
+        per-region mode, but only the few broad queries shared by all
+        regions in combined mode. The background calls left today are
+        spread evenly over the rounds until the quota resets. The configured
+        interval is the minimum.
+        """
+        if job.source != "news":
+            return job.interval_seconds
+        limiter = upstream_limiters["newsapi"]
+        remaining = limiter.quota_remaining(BACKGROUND)
+        if remaining is None:
+            return job.interval_seconds
+
+        news_jobs = sum(1 for other in self.jobs if other.source == "news")
+        round_cost = self.orchestrator.news_agent.calls_per_refresh(news_jobs)
+        runs_left = remaining / max(1, round_cost)
+        until_reset = limiter.seconds_until_quota_reset()
+        stretched = until_reset / runs_left if runs_left >= 1 else until_reset
+        return max(job.interval_seconds, stretched)
+
+    def _finish_job(self, job: RefreshJob, started: float) -> None:
+        """Record a finished run and schedule the next one."""
+        finished = time.monotonic()
+        job.last_duration_seconds = round(finished - started, 2)
+        job.runs += 1
+        job.running = False
+        # An interval of 0 means "continuously": re-run right away
+        job.next_run = finished + max(0.0, self._interval(job) + self._jitter())
+
+    async def _run_job(self, job: RefreshJob) -> None:
+        """Refresh one source from upstream and recompose its region (at background priority)."""
+        async with self._semaphore:
+            started = time.monotonic()
+            job.last_run = datetime.utcnow()
+            try:
+                with use_priority(BACKGROUND), bypass_cache():
+                    result = await self.orchestrator.refresh_component(job.region, job.source)
+                job.last_ok = result is not None
+                await self.orchestrator.compose(job.region)
+            except Exception as e:
+                job.last_ok = False
+                print(f"[Scheduler] Refresh of {job.source} for {job.region} failed: {str(e)}")
+            finally:
+                self._finish_job(job, started)
+
+    async def _run_batch_jobs(self, source: str, jobs: list[RefreshJob]) -> None:
+        """Refresh one source (news or weather) for several regions in one batch and recompose them."""
+        refresh = {
+            "news": self.orchestrator.refresh_news,
+            "weather": self.orchestrator.refresh_weather,
+        }[source]
+        async with self._semaphore:
+            started = time.monotonic()
+            for job in jobs:
+                job.last_run = datetime.utcnow()
+            try:
+                with use_priority(BACKGROUND), bypass_cache():
+                    results = await refresh([job.region for job in jobs])
+                for job in jobs:
+                    job.last_ok = results.get(job.region) is not None
+                    await self.orchestrator.compose(job.region)
+            except Exception as e:
+                regions = ", ".join(job.region for job in jobs)
+                print(f"[Scheduler] Batched {source} refresh for {regions} failed: {str(e)}")
+                for job in jobs:
+                    job.last_ok = False
+            finally:
+                for job in jobs:
+                    self._finish_job(job, started)
+
+    def _launch(self, coro) -> None:
+        """Run a job coroutine as a tracked task."""
+        task = asyncio.create_task(coro)
+        self._running_tasks.add(task)
+        task.add_done_callback(self._running_tasks.discard)
+
+    async def _loop(self) -> None:
+        """Launch due jobs until cancelled."""
+        batched = {"weather"}
+        if self.settings.llm_batch_size > 1:
+            batched.add("news")
+        while True:
+            now = time.monotonic()
+            due_sources = set()
+            for job in self.jobs:
+                if job.running or job.next_run > now:
+                    continue
+                if job.source in batched:
+                    due_sources.add(job.source)
+                    continue
+                job.running = True
+                self._launch(self._run_job(job))
+
+            for source in sorted(due_sources):
+                # Jobs of the source due within the jitter window run early,
+                # so they share batched LLM calls (news) or one fetch-and-score
+                # pass (weather)
+                horizon = now + max(0.0, self.settings.refresh_jitter_seconds)
+                jobs = [
+                    job
+                    for job in self.jobs
+                    if job.source == source and not job.running and job.next_run <= horizon
+                ]
+                for job in jobs:
+                    job.running = True
+                self._launch(self._run_batch_jobs(source, jobs))
+            await asyncio.sleep(self.TICK_SECONDS)
+
+    def _try_acquire_leadership(self) -> bool:
+        """Take the cross-process scheduler lock without blocking."""
+        path = self.settings.scheduler_lock_path
+        if not path or fcntl is None:
+            return True
+
+        lock_file = open(path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        self._publish_leader_info(ais_ingestion=False)
+        return True
+
+    def _publish_leader_info(self, ais_ingestion: bool) -> None:
+        """Record the leader's pid and whether it runs AIS ingestion in the lock file."""
+        if self._lock_file is None:
+            return
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        self._lock_file.write(json.dumps({"pid": os.getpid(), "ais_ingestion": ais_ingestion}))
+        self._lock_file.flush()
+
+    def ingestion_elsewhere(self) -> bool:
+        """Whether another worker is the scheduler leader and runs AIS ingestion."""
+        path = self.settings.scheduler_lock_path
+        if self.is_leader or not path or fcntl is None:
+            return False
+        try:
+            with open(path) as lock_file:
+                info = json.loads(lock_file.read() or "{}")
+        except (OSError, ValueError):
+            return False
+        if not isinstance(info, dict):
+            return False
+        return bool(info.get("ais_ingestion")) and info.get("pid") != os.getpid()
+
+    async def _lead(self) -> None:
+        """Wait until this process is the scheduler leader, then run the jobs."""
+        while not self._try_acquire_leadership():
+            await asyncio.sleep(self.LEADER_RETRY_SECONDS)
+
+        self.is_leader = True
+        if self.settings.ais_daemon_enabled and ais_daemon.start():
+            self._publish_leader_info(ais_ingestion=True)
+        self.jobs = self._build_jobs() if self.settings.refresh_enabled else []
+        print(f"[Scheduler] Started with {len(self.jobs)} refresh jobs")
+        await self._loop()
+
+    def start(self) -> None:
+        """Start leader election (then jobs and AIS ingestion) on the running event loop."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._lead())
+
+    async def stop(self) -> None:
+        """Stop the loop, AIS ingestion and any refresh still running."""
+        tasks = list(self._running_tasks)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Stop ingesting before the lock lets another worker start its daemon
+        await ais_daemon.stop()
+
+        if self._lock_file is not None:
+            self._publish_leader_info(ais_ingestion=False)
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    def get_schedule(self) -> dict:
+        """Get the refresh schedule and last-run information for every job."""
+        return {
+            "enabled": self.settings.refresh_enabled and self._task is not None,
+            "leader": self.is_leader,
+            "ais_ingestion": ais_daemon.is_running(),
+            "pid": os.getpid(),
+            "max_concurrency": self.settings.refresh_max_concurrency,
+            "jitter_seconds": self.settings.refresh_jitter_seconds,
+            "jobs": [job.to_dict() for job in self.jobs],
+        }
@@ -1,5 +1,6 @@
+from backend.services.http_pool import HTTPPool, http_pool
 from backend.services.news_api import NewsAPIClient
 from backend.services.weather_api import WeatherAPIClient
 from backend.services.llm_service import LLMService
 
-__all__ = ["NewsAPIClient", "WeatherAPIClient", "LLMService"]
+__all__ = ["HTTPPool", "http_pool", "NewsAPIClient", "WeatherAPIClient", "LLMService"]
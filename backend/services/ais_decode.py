@@ -0,0 +1,102 @@
+"""Fast-path decoding of AIS Stream websocket frames."""
+
+import json
+import re
+from typing import NamedTuple, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+
+# Frames that do not contain this token cannot be position reports
+_POSITION_REPORT_TOKEN = '"PositionReport"'
+_POSITION_REPORT_TOKEN_BYTES = _POSITION_REPORT_TOKEN.encode()
+# Position report MMSI, located without parsing the frame
+_MMSI_PATTERN = re.compile(r'"UserID":\s*(\d+)')
+_MMSI_PATTERN_BYTES = re.compile(rb'"UserID":\s*(\d+)')
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _loads(frame: Union[str, bytes]):
+    """Parse a JSON frame with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(frame)
+    return json.loads(frame)
+
+
+class PositionRecord(NamedTuple):
+    """The fields of a PositionReport used by the port pipeline."""
+
+    mmsi: int
+    lat: float
+    lon: float
+    sog: float
+    cog: float
+    nav_status: int
+    time_utc: Optional[str]
+
+
+def is_position_report(frame: Union[str, bytes]) -> bool:
+    """Cheap substring pre-filter that rejects other message types without parsing."""
+    if isinstance(frame, bytes):
+        return _POSITION_REPORT_TOKEN_BYTES in frame
+    return _POSITION_REPORT_TOKEN in frame
+
+
+def decode_position_report(frame: Union[str, bytes]) -> Optional[PositionRecord]:
+    """
+    Decode a websocket frame into a PositionRecord.
+
+    Args:
+        frame: Raw AIS Stream frame (text or binary JSON)
+
+    Returns:
+        PositionRecord, or None if the frame is not a usable position report
+    """
+    if not is_position_report(frame):
+        return None
+
+    try:
+        message = _loads(frame)
+        if message["MessageType"] != "PositionReport":
+            return None
+        report = message["Message"]["PositionReport"]
+        mmsi = report["UserID"]
+        lat = report["Latitude"]
+        lon = report["Longitude"]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if not mmsi or lat is None or lon is None:
+        return None
+
+    metadata = message.get("MetaData")
+    return PositionRecord(
+        mmsi,
+        lat,
+        lon,
+        report.get("Sog") or 0,
+        report.get("Cog") or 0,
+        report.get("NavigationalStatus") or 0,
+        metadata.get("time_utc") if metadata else None,
+    )
+
+
+def extract_mmsi(frame: Union[str, bytes]) -> Optional[int]:
+    """
+    Read a position report's MMSI without parsing the whole frame.
+
+    Used to key frames for conflation before they are decoded. Returns None
+    if the field cannot be found.
+    """
+    pattern = _MMSI_PATTERN_BYTES if isinstance(frame, bytes) else _MMSI_PATTERN
+    match = pattern.search(frame)
+    return int(match.group(1)) if match else None
+
+
+def decode_batch(frames: list[Union[str, bytes]]) -> list[Optional[PositionRecord]]:
+    """Decode several frames; a module-level function so process pools can run it."""
+    return [decode_position_report(frame) for frame in frames]
@@ -0,0 +1,360 @@
+"""Long-lived AIS Stream ingestion daemon with a live vessel table."""
+
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+import websockets
+from backend.config import get_settings
+from backend.services.vessel_table import VesselTable
+from backend.services.spatial_index import PortSpatialIndex
+from backend.services.ais_decode import (
+    PositionRecord,
+    decode_batch,
+    extract_mmsi,
+    is_position_report,
+)
+from backend.services.ingest_queue import IngestQueue
+from backend.services.rate_limit import BACKGROUND, upstream_limiters
+
+
+class AISIngestionDaemon:
+    """
+    Background task holding one AIS Stream subscription for every region.
+
+    Position reports are folded into a compact vessel table as they arrive,
+    so port congestion becomes an O(1) in-memory read instead of a
+    30-second websocket sample. The connection is re-established with
+    exponential backoff when it drops.
+
+    Ingestion runs as two stages joined by a bounded IngestQueue. The reader
+    only pre-filters frames and queues them, so it keeps up with the socket;
+    the processor decodes frames in batches (inline, in a worker thread or
+    in a worker process, per ``Settings.ais_decode_executor``) and applies
+    them to the vessel table, yielding to the event loop between batches.
+    Under a burst the queue conflates or drops frames
+    (``Settings.ais_overflow_policy``) instead of delaying API requests.
+    """
+
+    # Reconnect backoff bounds (seconds)
+    BACKOFF_INITIAL = 1.0
+    BACKOFF_MAX = 60.0
+    # Window over which the message rate is measured (seconds)
+    RATE_WINDOW = 10.0
+    # Evict expired vessels after this many position reports
+    EVICT_EVERY = 1000
+    # Measure feed lag on one in this many position reports
+    LAG_SAMPLE_EVERY = 64
+    # Frames decoded and applied per processing step
+    BATCH_SIZE = 256
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.ws_url = self.settings.aisstream_url
+        self._task: Optional[asyncio.Task] = None
+
+        # Port zones built once from the region config; a zone's index is
+        # also its port index in the vessel table
+        self.index = PortSpatialIndex.from_regions(
+            self.settings.regions, self.settings.ais_grid_cell_degrees
+        )
+        self._port_index = {zone.name: zone.index for zone in self.index.zones}
+        self.table = VesselTable(
+            len(self.index.zones),
+            self.settings.ais_vessel_ttl_seconds,
+            wait_window_size=self.settings.ais_wait_window_size,
+        )
+
+        self.queue: Optional[IngestQueue] = None
+        self._executor: Optional[Executor] = None
+
+        self._connected_since: Optional[float] = None
+        self._metrics = {
+            "messages_total": 0,
+            "position_reports_total": 0,
+            "connects": 0,
+            "disconnects": 0,
+            "last_error": None,
+        }
+        self._last_message_at: Optional[float] = None
+        self._lag_seconds: Optional[float] = None
+        # Receive time minus report time of the latest report: maps the wall
+        # clock onto the feed's clock (non-zero when replaying a recording)
+        self._clock_offset = 0.0
+        self._time_prefix: Optional[str] = None
+        self._time_prefix_epoch = 0.0
+        self._rate_window_start = time.monotonic()
+        self._rate_window_count = 0
+        self._messages_per_second = 0.0
+
+    def _record_rate(self) -> None:
+        """Count one message towards the rolling message rate."""
+        self._rate_window_count += 1
+        now = time.monotonic()
+        elapsed = now - self._rate_window_start
+        if elapsed >= self.RATE_WINDOW:
+            self._messages_per_second = self._rate_window_count / elapsed
+            self._rate_window_start = now
+            self._rate_window_count = 0
+
+    @staticmethod
+    def _parse_time_utc(value: Optional[str]) -> Optional[float]:
+        """Parse AIS Stream's MetaData.time_utc ("2024-01-15 10:30:00.123456789 +0000 UTC")."""
+        if not value:
+            return None
+        try:
+            parsed = datetime.strptime(value[:26], "%Y-%m-%d %H:%M:%S.%f")
+        except ValueError:
+            try:
+                parsed = datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                return None
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+    def _report_time(self, time_utc: Optional[str]) -> Optional[float]:
+        """
+        Parse a report's time_utc, caching the parsed whole second.
+
+        Consecutive reports mostly share the same second, so only the
+        fractional part is parsed for them.
+        """
+        if not time_utc or len(time_utc) < 19:
+            return None
+        prefix = time_utc[:19]
+        if prefix != self._time_prefix:
+            epoch = self._parse_time_utc(prefix)
+            if epoch is None:
+                return None
+            self._time_prefix = prefix
+            self._time_prefix_epoch = epoch
+        fraction = time_utc[19:26]
+        if fraction[:1] == "." and fraction[1:].isdigit():
+            return self._time_prefix_epoch + float(fraction)
+        return self._time_prefix_epoch
+
+    def feed_now(self) -> float:
+        """Current time on the feed's clock."""
+        return time.time() - self._clock_offset
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Create the decode executor on first use (None = decode inline)."""
+        mode = self.settings.ais_decode_executor
+        if mode == "inline":
+            return None
+        if self._executor is None:
+            if mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ais-decode")
+        return self._executor
+
+    def _on_frame(self, message_json: str | bytes) -> None:
+        """Reader stage: count a frame and queue it if it may be a position report."""
+        now = time.time()
+        self._metrics["messages_total"] += 1
+        self._last_message_at = now
+        self._record_rate()
+
+        if not is_position_report(message_json):
+            return
+        key = extract_mmsi(message_json)
+        self.queue.put(key if key is not None else message_json, (now, message_json))
+
+    def _apply_record(self, record: PositionRecord, received_at: float) -> None:
+        """
+        Fold one decoded position report into the vessel table.
+
+        Dwell and wait times use the report's own time (time_utc), so a
+        replayed recording yields the same waits at any replay speed.
+        """
+        self._metrics["position_reports_total"] += 1
+        seen_at = self._report_time(record.time_utc)
+        if seen_at is None:
+            seen_at = received_at
+        else:
+            self._clock_offset = received_at - seen_at
+            if self._metrics["position_reports_total"] % self.LAG_SAMPLE_EVERY == 1:
+                self._lag_seconds = max(0.0, received_at - seen_at)
+
+        ports = self.index.lookup(record.lat, record.lon)
+        if ports:
+            self.table.upsert(
+                record.mmsi,
+                record.lat,
+                record.lon,
+                record.sog,
+                record.cog,
+                record.nav_status,
+                ports,
+                seen_at,
+            )
+        else:
+            # Seen outside every port zone: a tracked vessel has departed
+            self.table.remove(record.mmsi, departed_at=seen_at)
+        if self._metrics["position_reports_total"] % self.EVICT_EVERY == 0:
+            self.table.evict_expired(seen_at)
+
+    async def _process(self) -> None:
+        """Processing stage: decode queued frames in batches and apply them."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        while True:
+            batch = await self.queue.get_batch(self.BATCH_SIZE)
+            if not batch:
+                return
+            frames = [frame for _, frame in batch]
+            if executor is None:
+                records = decode_batch(frames)
+            else:
+                records = await loop.run_in_executor(executor, decode_batch, frames)
+            for (received_at, _), record in zip(batch, records):
+                if record is None:
+                    continue
+                try:
+                    self._apply_record(record, received_at)
+                except Exception as e:
+                    self._metrics["last_error"] = f"Bad message: {str(e)}"
+            # Let API requests run between batches
+            await asyncio.sleep(0)
+
+    async def _consume(self) -> None:
+        """Open one subscription and process frames until it closes."""
+        await upstream_limiters["aisstream"].acquire(BACKGROUND)
+        async with websockets.connect(self.ws_url) as websocket:
+            subscribe_message = {
+                "APIKey": self.settings.aisstream_api_key,
+                "BoundingBoxes": self.index.subscription_boxes(),
+                "FilterMessageTypes": ["PositionReport"],
+            }
+            await websocket.send(json.dumps(subscribe_message))
+
+            self._connected_since = time.monotonic()
+            self._metrics["connects"] += 1
+            print(f"[AIS] Ingestion connected for {len(self.index.zones)} port zones")
+
+            self.queue = IngestQueue(
+                self.settings.ais_queue_size, self.settings.ais_overflow_policy
+            )
+            processor = asyncio.create_task(self._process())
+            try:
+                async for message_json in websocket:
+                    self._on_frame(message_json)
+                # Finish what was received before the connection closed
+                self.queue.close()
+                await processor
+            finally:
+                processor.cancel()
+                await asyncio.gather(processor, return_exceptions=True)
+
+    async def _run(self) -> None:
+        """Keep the subscription alive, reconnecting with exponential backoff."""
+        backoff = self.BACKOFF_INITIAL
+        while True:
+            started = time.monotonic()
+            try:
+                await self._consume()
+                self._metrics["last_error"] = "Connection closed by server"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._metrics["last_error"] = str(e)
+                print(f"[AIS] Ingestion connection error: {str(e)}")
+            finally:
+                if self._connected_since is not None:
+                    self._metrics["disconnects"] += 1
+                self._connected_since = None
+
+            # A connection that stayed up for a while resets the backoff
+            if time.monotonic() - started > self.BACKOFF_MAX:
+                backoff = self.BACKOFF_INITIAL
+            delay = backoff * random.uniform(0.5, 1.0)
+            backoff = min(self.BACKOFF_MAX, backoff * 2)
+            await asyncio.sleep(delay)
+
+    def start(self) -> bool:
+        """
+        Start ingestion on the running event loop.
+
+        Returns:
+            True if the daemon was started, False if AIS is not configured
+        """
+        if self._task is not None:
+            return True
+        if not self.settings.aisstream_api_key or not self.index.zones:
+            return False
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        """Stop ingestion, close the connection and release the decode worker."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def is_running(self) -> bool:
+        """Whether ingestion runs in this process."""
+        return self._task is not None
+
+    def is_warm(self) -> bool:
+        """Whether the vessel table has been fed long enough to be trusted."""
+        return (
+            self._connected_since is not None
+            and time.monotonic() - self._connected_since >= self.settings.ais_daemon_warmup_seconds
+        )
+
+    def get_port_congestion(self, region: str) -> Optional[dict]:
+        """
+        Read current vessel metrics for a region from the live vessel table.
+
+        Args:
+            region: Region name
+
+        Returns:
+            dict of VesselTable.get_port_stats metrics (vessel counts, queue
+            length, dwell and waiting times), or None if the daemon is not
+            running or not yet warm
+        """
+        port = self._port_index.get(region)
+        if port is None or not self.is_warm():
+            return None
+
+        now = self.feed_now()
+        self.table.evict_expired(now)
+        return self.table.get_port_stats(port, now)
+
+    def get_metrics(self) -> dict:
+        """Get ingestion metrics: message rate, lag and connection uptime."""
+        uptime = (
+            time.monotonic() - self._connected_since if self._connected_since is not None else 0.0
+        )
+        return {
+            "running": self.is_running(),
+            "connected": self._connected_since is not None,
+            "warm": self.is_warm(),
+            "uptime_seconds": round(uptime, 1),
+            "messages_per_second": round(self._messages_per_second, 2),
+            "lag_seconds": round(self._lag_seconds, 2) if self._lag_seconds is not None else None,
+            "tracked_vessels": {
+                zone.name: self.table.port_count[zone.index] for zone in self.index.zones
+            },
+            "vessel_table_bytes": self.table.memory_bytes(),
+            "decode_executor": self.settings.ais_decode_executor,
+            "queue": self.queue.get_metrics() if self.queue is not None else None,
+            "last_message_at": (
+                datetime.utcfromtimestamp(self._last_message_at).isoformat()
+                if self._last_message_at is not None
+                else None
+            ),
+            **self._metrics,
+        }
+
+
+# Global ingestion daemon instance
+ais_daemon = AISIngestionDaemon()
@@ -0,0 +1,65 @@
+"""Compact on-disk log of raw AIS Stream frames for record and replay."""
+
+import gzip
+import struct
+from typing import Iterator, Union
+
+
+# File header identifying the format and its version
+MAGIC = b"CWAIS1\n"
+# Per-frame header: receive time (float64 POSIX seconds), frame length (uint32)
+_FRAME_HEADER = struct.Struct("<dI")
+
+
+class AISLogWriter:
+    """
+    Append raw websocket frames with their receive timestamps to a gzip log.
+
+    Each record is a fixed 12-byte header followed by the frame bytes, so
+    replay can reproduce both the payloads and the original timing.
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        self.path = path
+        self.frames = 0
+        self._file = gzip.open(path, "wb", compresslevel=compresslevel)
+        self._file.write(MAGIC)
+
+    def write(self, received_at: float, frame: Union[str, bytes]) -> None:
+        """Append one frame received at POSIX time ``received_at``."""
+        if isinstance(frame, str):
+            frame = frame.encode()
+        self._file.write(_FRAME_HEADER.pack(received_at, len(frame)))
+        self._file.write(frame)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        self._file.close()
+
+    def __enter__(self) -> "AISLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_ais_log(path: str) -> Iterator[tuple[float, bytes]]:
+    """
+    Iterate over the frames of a recorded log.
+
+    Args:
+        path: Path of a log written by AISLogWriter
+
+    Yields:
+        (received_at, frame) tuples in recording order
+    """
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an AIS frame log")
+        while True:
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            received_at, length = _FRAME_HEADER.unpack(header)
+            yield received_at, f.read(length)
@@ -2,9 +2,67 @@
 
 import asyncio
 import json
+import time
 import websockets
 from typing import Optional
 from backend.config import get_settings
+from backend.services.ais_ingest import ais_daemon
+from backend.services.ais_decode import decode_position_report
+from backend.services.rate_limit import upstream_limiters
+from backend.services.spatial_index import radius_zone
+from backend.services.vessel_table import NAV_AT_ANCHOR, NAV_UNDERWAY, STATIONARY_STATUSES
+
+
+class VesselDiscoveryTracker:
+    """
+    Tracks how quickly new MMSIs appear in a sample to decide when to stop.
+
+    Uses the bias-corrected Chao1 richness estimator, which predicts the
+    total number of distinct vessels from how many were seen exactly once
+    (f1) and exactly twice (f2). Once the observed count is within the
+    tolerance of that estimate, further sampling is unlikely to find many
+    more vessels. Updates are O(1) per position report.
+    """
+
+    def __init__(self):
+        self.sightings: dict[int, int] = {}
+        self.reports = 0
+        self.f1 = 0
+        self.f2 = 0
+
+    def add(self, mmsi: int) -> None:
+        """Record one position report from a vessel."""
+        self.reports += 1
+        count = self.sightings.get(mmsi, 0) + 1
+        self.sightings[mmsi] = count
+        if count == 1:
+            self.f1 += 1
+        elif count == 2:
+            self.f1 -= 1
+            self.f2 += 1
+        elif count == 3:
+            self.f2 -= 1
+
+    @property
+    def observed(self) -> int:
+        """Distinct vessels seen so far."""
+        return len(self.sightings)
+
+    @property
+    def estimated_total(self) -> float:
+        """Chao1 estimate of the distinct vessels present in the area."""
+        return self.observed + self.f1 * (self.f1 - 1) / (2 * (self.f2 + 1))
+
+    @property
+    def confidence(self) -> float:
+        """Estimated fraction of the vessels present that have been seen (0-1)."""
+        if not self.observed:
+            return 0.0
+        return self.observed / self.estimated_total
+
+    def converged(self, tolerance: float) -> bool:
+        """Whether the observed count is within ``tolerance`` of the estimate."""
+        return self.observed > 0 and 1.0 - self.confidence <= tolerance
 
 
 class AISStreamService:
@@ -12,31 +70,43 @@ class AISStreamService:
 
     def __init__(self):
         self.settings = get_settings()
-        self.ws_url = "wss://stream.aisstream.io/v0/stream"
+        self.ws_url = self.settings.aisstream_url
 
     async def sample_port_vessels(
         self, 
         bounding_box: list[list[float]], 
-        duration_seconds: int = 10
+        duration_seconds: int = 10,
+        min_seconds: Optional[float] = None,
+        tolerance: Optional[float] = None,
     ) -> dict:
         """
-        Sample vessel data from a port area for a specified duration.
+        Sample vessel data from a port area.
+
+        When ``min_seconds`` and ``tolerance`` are given, sampling stops as
+        soon as the distinct-vessel estimate has converged within the
+        tolerance (checked after ``min_seconds``); ``duration_seconds`` is
+        then only the upper bound.
 
         Args:
             bounding_box: [[lat1, lon1], [lat2, lon2]] defining the area
-            duration_seconds: How long to sample data (default 10 seconds)
+            duration_seconds: Maximum sampling time (default 10 seconds)
+            min_seconds: Earliest time sampling may stop early
+            tolerance: Acceptable relative gap between observed and
+                estimated vessel count (e.g. 0.05)
 
         Returns:
-            dict with vessel_count, avg_speed, navigational_statuses, etc.
+            dict with vessel_count, avg_speed, confidence, sample_seconds, etc.
         """
         if not self.settings.aisstream_api_key:
             raise ValueError("AIS Stream API key not configured")
 
         vessels = {}
-        navigational_statuses = []
-        speeds = []
+        tracker = VesselDiscoveryTracker()
+        adaptive = min_seconds is not None and tolerance is not None
+        started = time.monotonic()
 
         try:
+            await upstream_limiters["aisstream"].acquire()
             async with websockets.connect(self.ws_url) as websocket:
                 # Subscribe to the port area
                 subscribe_message = {
@@ -47,46 +117,43 @@ class AISStreamService:
                 
                 await websocket.send(json.dumps(subscribe_message))
                 
-                print(f"[AIS] Sampling {duration_seconds}s for bbox {bounding_box}")
+                print(f"[AIS] Sampling up to {duration_seconds}s for bbox {bounding_box}")
                 message_count = 0
+                started = time.monotonic()
 
-                # Sample messages for the specified duration
+                # Sample messages until converged or the maximum duration
                 try:
                     async with asyncio.timeout(duration_seconds):
                         async for message_json in websocket:
                             message_count += 1
-                            message = json.loads(message_json)
-                            
-                            # Debug: Log first few messages
-                            if message_count <= 3:
-                                print(f"[AIS] Message {message_count}: {message.get('MessageType', 'Unknown')}")
-                            
-                            # Handle different message types
-                            if message.get("MessageType") == "PositionReport":
-                                ais_msg = message.get("Message", {}).get("PositionReport", {})
-                                
-                                vessel_id = ais_msg.get("UserID")
-                                if vessel_id:
-                                    vessels[vessel_id] = {
-                                        "mmsi": vessel_id,
-                                        "latitude": ais_msg.get("Latitude"),
-                                        "longitude": ais_msg.get("Longitude"),
-                                        "sog": ais_msg.get("Sog", 0),  # Speed over ground
-                                        "cog": ais_msg.get("Cog", 0),  # Course over ground
-                                        "nav_status": ais_msg.get("NavigationalStatus", 0),
-                                    }
-                                    
-                                    # Collect stats
-                                    speed = ais_msg.get("Sog", 0)
-                                    if speed is not None:
-                                        speeds.append(speed)
-                                    
-                                    nav_status = ais_msg.get("NavigationalStatus")
-                                    if nav_status is not None:
-                                        navigational_statuses.append(nav_status)
+                            record = decode_position_report(message_json)
+                            if record is None:
+                                continue
+
+                            vessels[record.mmsi] = {
+                                "mmsi": record.mmsi,
+                                "latitude": record.lat,
+                                "longitude": record.lon,
+                                "sog": record.sog,  # Speed over ground
+                                "cog": record.cog,  # Course over ground
+                                "nav_status": record.nav_status,
+                            }
+
+                            tracker.add(record.mmsi)
+
+                            if (
+                                adaptive
+                                and time.monotonic() - started >= min_seconds
+                                and tracker.converged(tolerance)
+                            ):
+                                print(
+                                    f"[AIS] Converged after {time.monotonic() - started:.1f}s: "
+                                    f"{len(vessels)} vessels, confidence {tracker.confidence:.2f}"
+                                )
+                                break
 
                 except asyncio.TimeoutError:
-                    # Expected - we've sampled for the desired duration
+                    # Expected - we've sampled for the maximum duration
                     print(f"[AIS] Timeout after {duration_seconds}s. Received {message_count} messages, found {len(vessels)} vessels")
                     pass
 
@@ -102,19 +169,28 @@ class AISStreamService:
             }
 
         # Calculate metrics
+        # Every metric uses each vessel's latest report, so vessels that
+        # transmit often are not counted more than once
         vessel_count = len(vessels)
-        avg_speed = sum(speeds) / len(speeds) if speeds else 0
-        
-        # Count stationary vs moving vessels
+        avg_speed = (
+            sum(vessel["sog"] for vessel in vessels.values()) / vessel_count if vessel_count else 0
+        )
+
         # NavigationalStatus: 0=underway, 1=at anchor, 5=moored, etc.
-        stationary_count = sum(1 for s in navigational_statuses if s in [1, 5])
-        moving_count = sum(1 for s in navigational_statuses if s == 0)
+        statuses = [vessel["nav_status"] for vessel in vessels.values()]
+        stationary_count = sum(1 for s in statuses if s in STATIONARY_STATUSES)
+        moving_count = sum(1 for s in statuses if s == NAV_UNDERWAY)
+        queue_length = sum(1 for s in statuses if s == NAV_AT_ANCHOR)
 
         return {
             "vessel_count": vessel_count,
             "avg_speed": round(avg_speed, 2),
             "stationary_count": stationary_count,
             "moving_count": moving_count,
+            "queue_length": queue_length,
+            "confidence": round(tracker.confidence, 3),
+            "estimated_vessel_count": round(tracker.estimated_total, 1),
+            "sample_seconds": round(time.monotonic() - started, 1),
             "vessels": list(vessels.values())
         }
 
@@ -122,20 +198,41 @@ class AISStreamService:
         """
         Get port congestion data for a specific region.
 
+        Reads the live vessel table when the ingestion daemon is running and
+        warm, otherwise samples the port area adaptively: sampling stops once
+        the vessel count estimate converges, or after the configured maximum.
+        A region with ``radius_km`` is sampled over the box enclosing its
+        circle.
+
         Args:
             region: Region name (Shanghai, Rotterdam, Los Angeles)
 
         Returns:
             Vessel metrics for the port area, or None if error
         """
+        live_metrics = ais_daemon.get_port_congestion(region)
+        if live_metrics is not None:
+            return live_metrics
+
         region_config = self.settings.regions.get(region)
-        if not region_config or "bbox" not in region_config:
+        if not region_config:
+            return None
+        if region_config.get("radius_km"):
+            bounding_box = radius_zone(
+                0, region, region_config["lat"], region_config["lon"], region_config["radius_km"]
+            ).bbox
+        elif "bbox" in region_config:
+            bounding_box = region_config["bbox"]
+        else:
             return None
 
-        bounding_box = region_config["bbox"]
-        
         try:
-            metrics = await self.sample_port_vessels(bounding_box, duration_seconds=30)
+            metrics = await self.sample_port_vessels(
+                bounding_box,
+                duration_seconds=self.settings.ais_sample_max_seconds,
+                min_seconds=self.settings.ais_sample_min_seconds,
+                tolerance=self.settings.ais_sample_tolerance,
+            )
             return metrics
         except Exception as e:
             print(f"Error fetching port congestion for {region}: {str(e)}")
@@ -0,0 +1,178 @@
+"""Persistent content-addressed cache of LLM news classifications."""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from typing import Optional
+from backend.config import get_settings
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace."""
+    return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+
+def classification_key(articles: list[dict], prompt_version: str, model: str) -> str:
+    """
+    Content address of a classification request.
+
+    Titles and descriptions are normalized (case, whitespace) and sorted, so
+    the same article set fetched in a different order maps to the same key.
+    """
+    lines = sorted(
+        f"{_normalize(article.get('title'))}: {_normalize(article.get('description'))}"
+        for article in articles
+    )
+    content = "\n".join([prompt_version, model, *lines])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    SQLite-backed LRU cache of classification results.
+
+    Entries record the tokens the original LLM call used, so hits report
+    the tokens saved. When the cache grows past ``max_entries`` the least
+    recently used entries are evicted. Without a path the cache only
+    counts lookups (every lookup misses).
+    """
+
+    # Check the size bound after this many inserts
+    EVICT_EVERY = 50
+
+    def __init__(self, path: Optional[str], max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._inserts_since_evict = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "tokens_saved": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS classifications (
+                        key TEXT PRIMARY KEY,
+                        result TEXT NOT NULL,
+                        tokens INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        last_used REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_classifications_last_used "
+                    "ON classifications (last_used)"
+                )
+            except sqlite3.Error as e:
+                print(f"[LLM] Could not open classification cache {path}: {str(e)}")
+                self._conn = None
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a classification.
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        row = None
+        if self._conn is not None:
+            try:
+                row = self._conn.execute(
+                    "SELECT result, tokens FROM classifications WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE classifications SET last_used = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+            except sqlite3.Error as e:
+                print(f"[LLM] Classification cache read failed: {str(e)}")
+                row = None
+
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._stats["tokens_saved"] += row[1]
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict, tokens: int = 0) -> None:
+        """Store a classification and the tokens it cost."""
+        if self._conn is None:
+            return
+        now = time.time()
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO classifications (key, result, tokens, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(result), tokens, now, now),
+            )
+        except sqlite3.Error as e:
+            print(f"[LLM] Classification cache write failed: {str(e)}")
+            return
+        self._stats["stores"] += 1
+
+        self._inserts_since_evict += 1
+        if self._inserts_since_evict >= self.EVICT_EVERY:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used entries beyond ``max_entries``.
+
+        Returns:
+            Number of entries deleted
+        """
+        self._inserts_since_evict = 0
+        if self._conn is None:
+            return 0
+        cursor = self._conn.execute(
+            """
+            DELETE FROM classifications WHERE key IN (
+                SELECT key FROM classifications ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._stats["evictions"] += cursor.rowcount
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        if self._conn is None:
+            return 0
+        return self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> dict:
+        """Get hit rate, tokens saved and size."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "enabled": self._conn is not None,
+            "entries": len(self),
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+        }
+
+
+def _create_classification_cache() -> ClassificationCache:
+    """Create the global cache at the configured path (empty disables persistence)."""
+    settings = get_settings()
+    return ClassificationCache(settings.llm_cache_path, settings.llm_cache_max_entries)
+
+
+# Global classification cache shared by all LLM service instances
+classification_cache = _create_classification_cache()
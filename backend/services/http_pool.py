@@ -0,0 +1,176 @@
+"""Process-wide pooled HTTP client shared by the external API clients."""
+
+import asyncio
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from backend.config import get_settings
+from backend.services.rate_limit import RateLimiter, parse_retry_after
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:  # HTTP/2 is optional; fall back to HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+
+class HTTPPool:
+    """
+    One keep-alive connection pool for every upstream API.
+
+    The underlying ``httpx.AsyncClient`` is created on first use and closed
+    by the application lifespan, so DNS, TCP and TLS setup are paid once
+    per connection instead of once per request. Concurrent requests to one
+    host are capped by ``Settings.http_max_connections_per_host``.
+
+    Connection reuse is measured with httpcore trace events: a request that
+    did not open a new TCP connection was served from the pool.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sdk_clients: list[httpx.AsyncClient] = []
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, dict] = {}
+
+    @property
+    def http2(self) -> bool:
+        """Whether HTTP/2 is enabled (requested and the h2 package is installed)."""
+        return self.settings.http2_enabled and HTTP2_AVAILABLE
+
+    def _client_options(self) -> dict:
+        """HTTP/2, connection limit and timeout options of pooled clients."""
+        return {
+            "http2": self.http2,
+            "limits": httpx.Limits(
+                max_connections=self.settings.http_max_connections,
+                max_keepalive_connections=self.settings.http_max_keepalive_connections,
+                keepalive_expiry=self.settings.http_keepalive_expiry_seconds,
+            ),
+            "timeout": httpx.Timeout(
+                self.settings.http_timeout_seconds,
+                connect=self.settings.http_connect_timeout_seconds,
+            ),
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_options())
+        return self._client
+
+    def create_sdk_client(self) -> httpx.AsyncClient:
+        """
+        Create a client for an SDK that sends its own requests (OpenAI).
+
+        It gets the pool's HTTP/2, connection limits and timeouts and is
+        closed together with the pool.
+        """
+        client = httpx.AsyncClient(**self._client_options())
+        self._sdk_clients.append(client)
+        return client
+
+    def _host_stats(self, host: str) -> dict:
+        """Counters for one host."""
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = {"requests": 0, "new_connections": 0, "tls_handshakes": 0, "errors": 0}
+            self._stats[host] = stats
+        return stats
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        """Concurrency limit for one host."""
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(max(1, self.settings.http_max_connections_per_host))
+            self._host_limits[host] = limit
+        return limit
+
+    async def request(
+        self, method: str, url: str, limiter: Optional[RateLimiter] = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the shared pool.
+
+        With a limiter, every attempt first acquires it, and HTTP 429
+        responses pause the limiter and are retried up to
+        ``Settings.upstream_max_retries`` times.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            limiter: Rate limiter of the upstream API
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Returns:
+            The response (status is not checked)
+
+        Raises:
+            RateLimitError: The limiter refused the call
+        """
+        if limiter is None:
+            return await self._send(method, url, **kwargs)
+
+        attempts = 1 + max(0, self.settings.upstream_max_retries)
+        for _ in range(attempts):
+            await limiter.acquire()
+            response = await self._send(method, url, **kwargs)
+            if response.status_code != 429:
+                return response
+            limiter.throttled(parse_retry_after(response.headers.get("Retry-After")))
+        return response
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one request, counting connection reuse for its host."""
+        host = urlsplit(url).netloc
+        stats = self._host_stats(host)
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                stats["new_connections"] += 1
+            elif event_name == "connection.start_tls.complete":
+                stats["tls_handshakes"] += 1
+
+        extensions = {**kwargs.pop("extensions", {}), "trace": trace}
+        async with self._host_limit(host):
+            stats["requests"] += 1
+            try:
+                return await self.client.request(method, url, extensions=extensions, **kwargs)
+            except httpx.RequestError:
+                stats["errors"] += 1
+                raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request through the shared pool."""
+        return await self.request("GET", url, **kwargs)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for client in self._sdk_clients:
+            await client.aclose()
+        self._sdk_clients.clear()
+
+    def get_stats(self) -> dict:
+        """Get per-host request, connection and reuse counters."""
+        hosts = {}
+        for host, stats in self._stats.items():
+            requests = stats["requests"]
+            reused = max(0, requests - stats["new_connections"])
+            hosts[host] = {
+                **stats,
+                "reuse_rate": round(reused / requests, 3) if requests else None,
+            }
+        return {
+            "http2": self.http2,
+            "open": self._client is not None and not self._client.is_closed,
+            "hosts": hosts,
+        }
+
+
+# Global pool shared by all service clients
+http_pool = HTTPPool()
@@ -0,0 +1,103 @@
+"""Bounded queue between the AIS reader and processing stages."""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Hashable, Literal
+
+
+OverflowPolicy = Literal["conflate", "drop"]
+
+
+class IngestQueue:
+    """
+    Bounded single-consumer queue with a configurable overflow policy.
+
+    ``conflate``: items are keyed (by MMSI); a new item replaces a pending one
+    with the same key in place, so only the latest position per vessel waits
+    to be processed. When the queue is full and the key is new, the oldest
+    pending item is dropped.
+
+    ``drop``: items are queued in arrival order; when the queue is full the
+    oldest pending item is dropped to make room.
+
+    ``put`` never blocks, so the reader keeps draining the socket however far
+    the processing stage falls behind.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy = "conflate"):
+        if policy not in ("conflate", "drop"):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items: OrderedDict | deque = OrderedDict() if policy == "conflate" else deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        self.enqueued = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, key: Hashable, item) -> None:
+        """Add an item, conflating or dropping according to the policy."""
+        self.enqueued += 1
+        if self.policy == "conflate":
+            if key in self._items:
+                self._items[key] = item
+                self.conflated += 1
+                return
+            if len(self._items) >= self.maxsize:
+                self._items.popitem(last=False)
+                self.dropped += 1
+            self._items[key] = item
+        else:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+
+        if len(self._items) > self.high_water:
+            self.high_water = len(self._items)
+        self._ready.set()
+
+    def close(self) -> None:
+        """Signal that no more items will be added."""
+        self._closed = True
+        self._ready.set()
+
+    async def get_batch(self, max_items: int) -> list:
+        """
+        Wait for items and take up to ``max_items`` of them in queue order.
+
+        Returns:
+            List of items; empty only once the queue is closed and drained
+        """
+        while not self._items:
+            if self._closed:
+                return []
+            self._ready.clear()
+            await self._ready.wait()
+
+        batch = []
+        if self.policy == "conflate":
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popitem(last=False)[1])
+        else:
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popleft())
+        return batch
+
+    def get_metrics(self) -> dict:
+        """Get queue depth and overflow counters."""
+        return {
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "depth": len(self._items),
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+        }
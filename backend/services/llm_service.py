@@ -1,55 +1,213 @@
+import asyncio
 import json
-from openai import AsyncOpenAI
-from typing import Optional
+import time
+from openai import AsyncOpenAI, RateLimitError as OpenAIRateLimitError
+from typing import AsyncIterator, Optional
 from backend.config import get_settings
+from backend.services.classification_cache import (
+    ClassificationCache,
+    classification_cache,
+    classification_key,
+)
+from backend.services.http_pool import http_pool
+from backend.services.rate_limit import RateLimiter, parse_retry_after, upstream_limiters
+
+
+# Output specification shared by the single and batched news classification prompts
+NEWS_CLASSIFICATION_CRITERIA = """1. event_type: The primary type of disruption (one of: strike, conflict, disaster, pandemic, policy, weather, infrastructure, none)
+2. severity: A score from 1-5 where:
+   - 1: No significant risk
+   - 2: Minor potential disruption
+   - 3: Moderate risk, may cause delays
+   - 4: High risk, likely significant disruption
+   - 5: Critical, severe supply chain impact expected
+3. summary: A brief 1-2 sentence summary of the key findings"""
+
+NEWS_SYSTEM_PROMPT = "You are a supply chain risk analyst. Analyze news for disruption risks and provide structured assessments."
+
+
+NO_STATE_ANSWER = (
+    "No risk assessment data is available. Please run an analysis first by selecting a region."
+)
+
+
+class StreamMetrics:
+    """Time to first token and total duration of streamed completions, per kind."""
+
+    def __init__(self):
+        self._stats: dict[str, dict] = {}
+
+    def record(
+        self,
+        kind: str,
+        ttft_seconds: Optional[float],
+        duration_seconds: float,
+        aborted: bool = False,
+    ) -> None:
+        """Record one stream; aborted streams (failed or disconnected) are only counted."""
+        stats = self._stats.setdefault(
+            kind,
+            {
+                "streams": 0,
+                "aborted": 0,
+                "ttft_seconds_total": 0.0,
+                "duration_seconds_total": 0.0,
+                "last_ttft_seconds": None,
+            },
+        )
+        if ttft_seconds is not None:
+            stats["last_ttft_seconds"] = round(ttft_seconds, 3)
+        if aborted:
+            stats["aborted"] += 1
+            return
+        stats["streams"] += 1
+        stats["ttft_seconds_total"] += ttft_seconds if ttft_seconds is not None else duration_seconds
+        stats["duration_seconds_total"] += duration_seconds
+
+    def get_stats(self) -> dict:
+        """Get completed and aborted stream counts and averages of completed streams per kind."""
+        return {
+            kind: {
+                "streams": stats["streams"],
+                "aborted": stats["aborted"],
+                "avg_ttft_seconds": round(stats["ttft_seconds_total"] / stats["streams"], 3)
+                if stats["streams"] else None,
+                "avg_duration_seconds": round(stats["duration_seconds_total"] / stats["streams"], 3)
+                if stats["streams"] else None,
+                "last_ttft_seconds": stats["last_ttft_seconds"],
+            }
+            for kind, stats in self._stats.items()
+        }
+
+
+# Global streaming metrics shared by all LLM service instances
+stream_metrics = StreamMetrics()
+
+
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Get the OpenAI client shared by all LLM service instances.
+
+    Created on first use, on an HTTP client with the shared pool's limits,
+    so every instance reuses the same keep-alive connections.
+    """
+    global _openai_client
+    if _openai_client is None or _openai_client.is_closed():
+        _openai_client = AsyncOpenAI(
+            api_key=get_settings().openai_api_key,
+            http_client=http_pool.create_sdk_client(),
+        )
+    return _openai_client
 
 
 class LLMService:
     """Service for LLM-powered text analysis using OpenAI."""
 
-    def __init__(self):
+    # Bump when the news classification prompt changes so cached results
+    # from the old prompt are no longer used
+    NEWS_PROMPT_VERSION = "1"
+
+    def __init__(
+        self,
+        cache: Optional[ClassificationCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(api_key=self.settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = "gpt-4o-mini"
+        self.cache = cache if cache is not None else classification_cache
+        self.rate_limiter = rate_limiter if rate_limiter is not None else upstream_limiters["openai"]
+        self.batch_stats = {"batch_calls": 0, "batched_regions": 0, "fallback_regions": 0}
+
+    async def _create_completion(self, **kwargs):
+        """
+        Create a chat completion through the OpenAI rate limiter.
+
+        Raises:
+            RateLimitError: The limiter refused the call
+        """
+        await self.rate_limiter.acquire()
+        try:
+            return await self.client.chat.completions.create(**kwargs)
+        except OpenAIRateLimitError as e:
+            self.rate_limiter.throttled(parse_retry_after(e.response.headers.get("retry-after")))
+            raise
+
+    @staticmethod
+    def _no_news_classification() -> dict:
+        """Classification for a region without articles."""
+        return {
+            "event_type": "none",
+            "severity": 1,
+            "summary": "No relevant news found for this region.",
+        }
+
+    @staticmethod
+    def _failed_classification(error: Exception) -> dict:
+        """Classification reported when the LLM call fails (marked with "error")."""
+        return {
+            "event_type": "none",
+            "severity": 1,
+            "summary": f"Error analyzing news: {str(error)}",
+            "error": True,
+        }
+
+    @staticmethod
+    def _format_articles(news_articles: list[dict]) -> str:
+        """One "- title: description" line per article."""
+        return "\n".join(
+            [
+                f"- {article.get('title', '')}: {article.get('description', '')}"
+                for article in news_articles
+            ]
+        )
+
+    @staticmethod
+    def _normalize_classification(result: dict) -> dict:
+        """Fill defaults and clamp the severity of a parsed classification."""
+        return {
+            "event_type": result.get("event_type", "none"),
+            "severity": min(max(int(result.get("severity", 1)), 1), 5),
+            "summary": result.get("summary", "Unable to analyze news."),
+        }
 
     async def classify_news_risk(self, news_articles: list[dict]) -> dict:
         """
         Classify news articles for supply chain risk.
 
+        Results are cached by the content of the articles, the prompt
+        version and the model, so an identical article set is never
+        classified twice.
+
         Args:
             news_articles: List of news articles with title and description
 
         Returns:
-            dict with event_type, severity, and summary
+            dict with event_type, severity, and summary ("error" is set when
+            the LLM call failed)
         """
         if not news_articles:
-            return {
-                "event_type": "none",
-                "severity": 1,
-                "summary": "No relevant news found for this region.",
-            }
+            return self._no_news_classification()
 
-        articles_text = "\n".join(
-            [
-                f"- {article.get('title', '')}: {article.get('description', '')}"
-                for article in news_articles[:10]
-            ]
-        )
+        news_articles = news_articles[:10]
+        cache_key = classification_key(news_articles, self.NEWS_PROMPT_VERSION, self.model)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await self._classify_uncached(news_articles, cache_key)
 
+    async def _classify_uncached(self, news_articles: list[dict], cache_key: str) -> dict:
+        """Classify one article set with the LLM and cache the result."""
         prompt = f"""Analyze the following news headlines for supply chain disruption risks.
 
 NEWS ARTICLES:
-{articles_text}
+{self._format_articles(news_articles)}
 
 Based on these articles, provide:
-1. event_type: The primary type of disruption (one of: strike, conflict, disaster, pandemic, policy, weather, infrastructure, none)
-2. severity: A score from 1-5 where:
-   - 1: No significant risk
-   - 2: Minor potential disruption
-   - 3: Moderate risk, may cause delays
-   - 4: High risk, likely significant disruption
-   - 5: Critical, severe supply chain impact expected
-3. summary: A brief 1-2 sentence summary of the key findings
+{NEWS_CLASSIFICATION_CRITERIA}
 
 Respond in JSON format:
 {{"event_type": "...", "severity": N, "summary": "..."}}
@@ -57,13 +215,10 @@ Respond in JSON format:
 If no supply chain relevant news is found, return event_type "none" with severity 1."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model=self.model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a supply chain risk analyst. Analyze news for disruption risks and provide structured assessments.",
-                    },
+                    {"role": "system", "content": NEWS_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.3,
@@ -71,40 +226,142 @@ If no supply chain relevant news is found, return event_type "none" with severit
             )
 
             result = json.loads(response.choices[0].message.content)
-            return {
-                "event_type": result.get("event_type", "none"),
-                "severity": min(max(int(result.get("severity", 1)), 1), 5),
-                "summary": result.get("summary", "Unable to analyze news."),
-            }
+            classification = self._normalize_classification(result)
+            tokens = response.usage.total_tokens if response.usage else 0
+            self.cache.put(cache_key, classification, tokens)
+            return classification
 
         except Exception as e:
-            return {
-                "event_type": "none",
-                "severity": 1,
-                "summary": f"Error analyzing news: {str(e)}",
-            }
+            return self._failed_classification(e)
 
-    async def generate_explanation(
-        self,
-        region: str,
-        news_risk: Optional[dict],
-        weather_risk: Optional[dict],
-        port_risk: Optional[dict],
-        aggregated_risk: Optional[dict],
-    ) -> str:
+    async def classify_news_risk_batch(
+        self, region_articles: dict[str, list[dict]]
+    ) -> dict[str, dict]:
         """
-        Generate a plain-language explanation of the overall risk assessment.
+        Classify the news of several regions with as few LLM calls as possible.
+
+        Regions missing from the classification cache are packed into one
+        structured request per ``Settings.llm_batch_size`` regions, so the
+        instructions are sent once per batch instead of once per region.
+        Regions the batched response does not classify (or all regions of a
+        batch whose response cannot be parsed) fall back to one call each;
+        when the batched call itself fails (rate limit or API error), every
+        region of the batch gets the failed classification instead.
 
         Args:
-            region: Region being analyzed
-            news_risk: News risk output
-            weather_risk: Weather risk output
-            port_risk: Port risk output
-            aggregated_risk: Aggregated risk output
+            region_articles: Region name -> articles with title and description
 
         Returns:
-            Plain-language explanation string
+            Region name -> dict with event_type, severity, and summary
         """
+        results = {}
+        pending: dict[str, tuple[list[dict], str]] = {}
+        for region, news_articles in region_articles.items():
+            if not news_articles:
+                results[region] = self._no_news_classification()
+                continue
+            news_articles = news_articles[:10]
+            cache_key = classification_key(news_articles, self.NEWS_PROMPT_VERSION, self.model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[region] = cached
+            else:
+                pending[region] = (news_articles, cache_key)
+
+        regions = list(pending)
+        size = max(1, self.settings.llm_batch_size)
+        batches = [regions[i : i + size] for i in range(0, len(regions), size)]
+        for batch_results in await asyncio.gather(
+            *(
+                self._classify_batch({region: pending[region] for region in batch})
+                for batch in batches
+            )
+        ):
+            results.update(batch_results)
+        return results
+
+    async def _classify_batch(
+        self, pending: dict[str, tuple[list[dict], str]]
+    ) -> dict[str, dict]:
+        """Classify several regions' article sets in one LLM call."""
+        if len(pending) == 1:
+            region, (news_articles, cache_key) = next(iter(pending.items()))
+            return {region: await self._classify_uncached(news_articles, cache_key)}
+
+        sections = "\n\n".join(
+            f'REGION "{region}":\n{self._format_articles(news_articles)}'
+            for region, (news_articles, _) in pending.items()
+        )
+        prompt = f"""Analyze the following news headlines for supply chain disruption risks, separately for each region.
+
+{sections}
+
+Based on each region's articles, provide for that region:
+{NEWS_CLASSIFICATION_CRITERIA}
+
+Respond in JSON format with one entry per region, keyed by the region name:
+{{"regions": {{"<region>": {{"event_type": "...", "severity": N, "summary": "..."}}}}}}
+
+If no supply chain relevant news is found for a region, return event_type "none" with severity 1 for it."""
+
+        try:
+            response = await self._create_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": NEWS_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"},
+            )
+        except Exception as e:
+            # Rate limits and API errors would hit per-region calls too
+            print(f"[LLM] Batch classification of {len(pending)} regions failed: {str(e)}")
+            return {region: self._failed_classification(e) for region in pending}
+
+        self.batch_stats["batch_calls"] += 1
+        tokens = response.usage.total_tokens if response.usage else 0
+        try:
+            parsed = json.loads(response.choices[0].message.content or "")
+        except json.JSONDecodeError as e:
+            print(f"[LLM] Unparseable batch classification of {len(pending)} regions: {str(e)}")
+            parsed = {}
+        regions = parsed.get("regions") if isinstance(parsed, dict) else None
+        if not isinstance(regions, dict):
+            regions = {}
+
+        results = {}
+        fallback = {}
+        for region, (news_articles, cache_key) in pending.items():
+            entry = regions.get(region)
+            try:
+                if not isinstance(entry, dict) or not {"event_type", "severity"} <= entry.keys():
+                    raise ValueError("missing classification")
+                classification = self._normalize_classification(entry)
+            except (TypeError, ValueError):
+                fallback[region] = (news_articles, cache_key)
+                continue
+            results[region] = classification
+            self.cache.put(cache_key, classification, tokens // len(pending))
+            self.batch_stats["batched_regions"] += 1
+
+        if fallback:
+            self.batch_stats["fallback_regions"] += len(fallback)
+            classifications = await asyncio.gather(
+                *(self._classify_uncached(articles, key) for articles, key in fallback.values())
+            )
+            results.update(zip(fallback, classifications))
+        return results
+
+    def _explanation_request(
+        self,
+        region: str,
+        news_risk: Optional[dict],
+        weather_risk: Optional[dict],
+        port_risk: Optional[dict],
+        aggregated_risk: Optional[dict],
+    ) -> dict:
+        """Build the chat completion arguments for a risk explanation."""
         context = f"""Region: {region}
 
 NEWS RISK:
@@ -140,18 +397,45 @@ Requirements:
 
 Provide only the explanation text, no headers or formatting."""
 
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a supply chain risk communication specialist. Provide clear, factual explanations of risk assessments.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.5,
+            "max_tokens": 300,
+        }
+
+    async def generate_explanation(
+        self,
+        region: str,
+        news_risk: Optional[dict],
+        weather_risk: Optional[dict],
+        port_risk: Optional[dict],
+        aggregated_risk: Optional[dict],
+    ) -> str:
+        """
+        Generate a plain-language explanation of the overall risk assessment.
+
+        Args:
+            region: Region being analyzed
+            news_risk: News risk output
+            weather_risk: Weather risk output
+            port_risk: Port risk output
+            aggregated_risk: Aggregated risk output
+
+        Returns:
+            Plain-language explanation string
+        """
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a supply chain risk communication specialist. Provide clear, factual explanations of risk assessments.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.5,
-                max_tokens=300,
+            response = await self._create_completion(
+                **self._explanation_request(
+                    region, news_risk, weather_risk, port_risk, aggregated_risk
+                )
             )
 
             return response.choices[0].message.content.strip()
@@ -159,24 +443,44 @@ Provide only the explanation text, no headers or formatting."""
         except Exception as e:
             return f"Unable to generate explanation: {str(e)}"
 
-    async def answer_chat_question(
+    async def stream_explanation(
         self,
-        question: str,
-        system_state: Optional[dict],
-    ) -> str:
+        region: str,
+        news_risk: Optional[dict],
+        weather_risk: Optional[dict],
+        port_risk: Optional[dict],
+        aggregated_risk: Optional[dict],
+        timing: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
         """
-        Answer a user question based on current system state.
+        Stream a plain-language explanation of the overall risk assessment.
 
         Args:
-            question: User's question
-            system_state: Current system state dict
+            region: Region being analyzed
+            news_risk: News risk output
+            weather_risk: Weather risk output
+            port_risk: Port risk output
+            aggregated_risk: Aggregated risk output
+            timing: Filled with ttft_seconds and duration_seconds
 
-        Returns:
-            Answer string
+        Yields:
+            Text fragments as the model produces them
         """
-        if not system_state:
-            return "No risk assessment data is currently available. Please run an analysis first."
-
+        request = self._explanation_request(
+            region, news_risk, weather_risk, port_risk, aggregated_risk
+        )
+        async for text in self._stream_completion("explanation", request, timing):
+            yield text
+
+    def _chat_request(self, question: str, system_state: dict) -> dict:
+        """Build the chat completion arguments for a question about a system state."""
+        weather_risk = system_state.get('weather_risk', {})
+        if isinstance(weather_risk, dict) and "severity_timeline" in weather_risk:
+            # The per-slot forecast timeline would dominate the prompt;
+            # worst_window summarizes it
+            weather_risk = {
+                key: value for key, value in weather_risk.items() if key != "severity_timeline"
+            }
         context = f"""Current System State:
 Region: {system_state.get('region', 'Unknown')}
 Last Updated: {system_state.get('timestamp', 'Unknown')}
@@ -185,7 +489,7 @@ News Risk:
 {json.dumps(system_state.get('news_risk', {}), indent=2)}
 
 Weather Risk:
-{json.dumps(system_state.get('weather_risk', {}), indent=2)}
+{json.dumps(weather_risk, indent=2)}
 
 Port Risk:
 {json.dumps(system_state.get('port_risk', {}), indent=2)}
@@ -207,21 +511,110 @@ Requirements:
 3. Be concise and direct
 4. Do not speculate or make up information"""
 
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that answers questions about supply chain risk assessments. Only use the provided data to answer questions.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.3,
+            "max_tokens": 500,
+        }
+
+    async def answer_chat_question(
+        self,
+        question: str,
+        system_state: Optional[dict],
+    ) -> str:
+        """
+        Answer a user question based on current system state.
+
+        Args:
+            question: User's question
+            system_state: Current system state dict
+
+        Returns:
+            Answer string
+        """
+        if not system_state:
+            return NO_STATE_ANSWER
+
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that answers questions about supply chain risk assessments. Only use the provided data to answer questions.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
-                max_tokens=500,
-            )
+            response = await self._create_completion(**self._chat_request(question, system_state))
 
             return response.choices[0].message.content.strip()
 
         except Exception as e:
             return f"Error processing your question: {str(e)}"
+
+    async def stream_chat_answer(
+        self,
+        question: str,
+        system_state: Optional[dict],
+        timing: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the answer to a user question based on current system state.
+
+        Args:
+            question: User's question
+            system_state: Current system state dict
+            timing: Filled with ttft_seconds and duration_seconds
+
+        Yields:
+            Text fragments as the model produces them
+        """
+        if not system_state:
+            yield NO_STATE_ANSWER
+            return
+
+        async for text in self._stream_completion(
+            "chat", self._chat_request(question, system_state), timing
+        ):
+            yield text
+
+    async def _stream_completion(
+        self, kind: str, request: dict, timing: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion's text, recording time to first token.
+
+        The upstream stream is closed even when the consumer stops early
+        (e.g. a disconnected client); such streams, and streams that fail to
+        open, count as aborted.
+
+        Args:
+            kind: Metrics bucket ("chat" or "explanation")
+            request: Chat completion arguments
+            timing: Filled with ttft_seconds and duration_seconds
+
+        Yields:
+            Non-empty text fragments
+        """
+        timing = timing if timing is not None else {}
+        started = time.monotonic()
+        stream = None
+        completed = False
+        try:
+            stream = await self._create_completion(**request, stream=True)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if not text:
+                    continue
+                if "ttft_seconds" not in timing:
+                    timing["ttft_seconds"] = time.monotonic() - started
+                yield text
+            completed = True
+        finally:
+            # Also runs when the client disconnects: release the HTTP response
+            if stream is not None:
+                await stream.close()
+            timing["duration_seconds"] = time.monotonic() - started
+            stream_metrics.record(
+                kind, timing.get("ttft_seconds"), timing["duration_seconds"], aborted=not completed
+            )
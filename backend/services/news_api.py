@@ -1,15 +1,38 @@
+import asyncio
 import httpx
 from typing import Optional
 from backend.config import get_settings
+from backend.services.http_pool import HTTPPool, http_pool
+from backend.services.rate_limit import RateLimiter, RateLimitError, upstream_limiters
 
 
 class NewsAPIClient:
     """Client for NewsAPI.org to fetch news headlines."""
 
     BASE_URL = "https://newsapi.org/v2"
+    # NewsAPI rejects "q" values longer than this
+    MAX_QUERY_LENGTH = 500
+    # NewsAPI's maximum page size
+    MAX_PAGE_SIZE = 100
+    SUPPLY_CHAIN_KEYWORDS = [
+        "port disruption",
+        "shipping delay",
+        "supply chain",
+        "logistics",
+        "dock strike",
+        "cargo",
+        "container",
+        "freight",
+    ]
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool: Optional[HTTPPool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.settings = get_settings()
+        self.pool = pool or http_pool
+        self.rate_limiter = rate_limiter if rate_limiter is not None else upstream_limiters["newsapi"]
         self.api_key = self.settings.news_api_key
 
     async def fetch_headlines(
@@ -17,6 +40,7 @@ class NewsAPIClient:
         query: str,
         language: str = "en",
         page_size: int = 10,
+        published_after: Optional[str] = None,
     ) -> dict:
         """
         Fetch news headlines related to a query.
@@ -25,6 +49,8 @@ class NewsAPIClient:
             query: Search query (e.g., "Shanghai port disruption")
             language: Language code (default: en)
             page_size: Number of articles to fetch (default: 10)
+            published_after: Only return articles published at or after this
+                ISO 8601 time (NewsAPI "from")
 
         Returns:
             dict with articles or error information
@@ -43,27 +69,30 @@ class NewsAPIClient:
             "sortBy": "publishedAt",
             "apiKey": self.api_key,
         }
+        if published_after:
+            params["from"] = published_after
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{self.BASE_URL}/everything", params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                return {
-                    "status": "ok",
-                    "total_results": data.get("totalResults", 0),
-                    "articles": [
-                        {
-                            "title": article.get("title", ""),
-                            "description": article.get("description", ""),
-                            "source": article.get("source", {}).get("name", "Unknown"),
-                            "published_at": article.get("publishedAt", ""),
-                            "url": article.get("url", ""),
-                        }
-                        for article in data.get("articles", [])
-                    ],
-                }
+            response = await self.pool.get(
+                f"{self.BASE_URL}/everything", limiter=self.rate_limiter, params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            return {
+                "status": "ok",
+                "total_results": data.get("totalResults", 0),
+                "articles": [
+                    {
+                        "title": article.get("title", ""),
+                        "description": article.get("description", ""),
+                        "source": article.get("source", {}).get("name", "Unknown"),
+                        "published_at": article.get("publishedAt", ""),
+                        "url": article.get("url", ""),
+                    }
+                    for article in data.get("articles", [])
+                ],
+            }
 
         except httpx.HTTPStatusError as e:
             return {
@@ -77,6 +106,12 @@ class NewsAPIClient:
                 "message": f"Request error: {str(e)}",
                 "articles": [],
             }
+        except RateLimitError as e:
+            return {
+                "status": "error",
+                "message": f"Rate limited: {str(e)}",
+                "articles": [],
+            }
         except Exception as e:
             return {
                 "status": "error",
@@ -84,26 +119,81 @@ class NewsAPIClient:
                 "articles": [],
             }
 
-    async def fetch_supply_chain_news(self, region: str) -> dict:
+    async def fetch_supply_chain_news(
+        self, region: str, published_after: Optional[str] = None
+    ) -> dict:
         """
         Fetch supply chain related news for a specific region.
 
         Args:
             region: Region name (e.g., "Shanghai", "Rotterdam")
+            published_after: Only fetch articles published at or after this
+                ISO 8601 time
 
         Returns:
             dict with relevant news articles
         """
-        supply_chain_keywords = [
-            "port disruption",
-            "shipping delay",
-            "supply chain",
-            "logistics",
-            "dock strike",
-            "cargo",
-            "container",
-            "freight",
-        ]
-
-        query = f"{region} ({' OR '.join(supply_chain_keywords)})"
-        return await self.fetch_headlines(query)
+        query = f"{region} ({' OR '.join(self.SUPPLY_CHAIN_KEYWORDS)})"
+        return await self.fetch_headlines(query, published_after=published_after)
+
+    def build_combined_queries(self, place_names: list[str]) -> list[str]:
+        """
+        Pack place names into as few NewsAPI queries as the length limit allows.
+
+        Each query has the form ("A" OR "B" ...) AND (keyword OR ...).
+        """
+        suffix = f" AND ({' OR '.join(self.SUPPLY_CHAIN_KEYWORDS)})"
+        budget = self.MAX_QUERY_LENGTH - len(suffix) - 2
+        queries, group = [], []
+        for name in dict.fromkeys(place_names):
+            term = f'"{name}"'
+            if group and len(" OR ".join(group + [term])) > budget:
+                queries.append(f"({' OR '.join(group)}){suffix}")
+                group = []
+            group.append(term)
+        if group:
+            queries.append(f"({' OR '.join(group)}){suffix}")
+        return queries
+
+    async def fetch_combined_supply_chain_news(
+        self, place_names: list[str], published_after: Optional[str] = None
+    ) -> dict:
+        """
+        Fetch supply chain news for many places with a few broad queries.
+
+        Args:
+            place_names: Region and port names to cover
+            published_after: Only fetch articles published at or after this
+                ISO 8601 time
+
+        Returns:
+            dict with the articles of all queries (deduplicated by URL);
+            status is "error" only if every query failed
+        """
+        results = await asyncio.gather(
+            *(
+                self.fetch_headlines(
+                    query, page_size=self.MAX_PAGE_SIZE, published_after=published_after
+                )
+                for query in self.build_combined_queries(place_names)
+            )
+        )
+
+        articles, seen = [], set()
+        for result in results:
+            for article in result.get("articles", []):
+                key = article.get("url") or article.get("title")
+                if key not in seen:
+                    seen.add(key)
+                    articles.append(article)
+        # Keep the newest-first order of single queries
+        articles.sort(key=lambda article: article.get("published_at") or "", reverse=True)
+
+        ok = any(result["status"] == "ok" for result in results)
+        return {
+            "status": "ok" if ok else "error",
+            "message": None if ok else (results[0].get("message") if results else "No queries"),
+            "total_results": sum(result.get("total_results", 0) for result in results),
+            "articles": articles,
+            "queries": len(results),
+        }
@@ -0,0 +1,150 @@
+"""Incremental per-region news windows with article deduplication."""
+
+import hashlib
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from backend.config import get_settings
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace for content comparison."""
+    return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+
+def content_hash(article: dict) -> str:
+    """Hash of an article's normalized title and description."""
+    content = f"{_normalize(article.get('title'))}\n{_normalize(article.get('description'))}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse NewsAPI's publishedAt ("2024-01-15T10:30:00Z")."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class NewsFeed:
+    """
+    Recent articles per region, fed incrementally.
+
+    Each region remembers the newest ``published_at`` it has seen, so the
+    next fetch only asks NewsAPI for newer articles. Articles are identified
+    by URL and by a hash of their normalized title and description, so
+    re-fetched and syndicated copies are recognised across regions and runs.
+    Each region keeps a rolling window of at most ``news_window_size``
+    articles no older than ``news_window_max_age_hours``.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        # region -> {content hash: article}, oldest first
+        self._windows: dict[str, OrderedDict[str, dict]] = {}
+        self._newest: dict[str, str] = {}
+        # URL / content hash -> content hash of every article seen (bounded)
+        self._seen: OrderedDict[str, str] = OrderedDict()
+        self._stats = {"fetched": 0, "new": 0, "duplicates": 0}
+
+    def newest_published_at(self, region: str) -> Optional[str]:
+        """Publication time of the newest article seen for a region, if any."""
+        return self._newest.get(region)
+
+    def _remember(self, key: str, digest: str) -> None:
+        """Record an identity key, evicting the oldest beyond the bound."""
+        self._seen[key] = digest
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.settings.news_seen_max_entries:
+            self._seen.popitem(last=False)
+
+    def _prune(self, region: str) -> None:
+        """Drop a region's articles beyond the size or age bound."""
+        window = self._windows.get(region)
+        if not window:
+            return
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.settings.news_window_max_age_hours)
+        for digest in [
+            digest
+            for digest, article in window.items()
+            if (published := _parse_published_at(article.get("published_at"))) and published < cutoff
+        ]:
+            del window[digest]
+        while len(window) > self.settings.news_window_size:
+            window.popitem(last=False)
+
+    def add(self, region: str, articles: list[dict]) -> list[dict]:
+        """
+        Merge fetched articles into a region's window.
+
+        Args:
+            region: Region name
+            articles: Articles as returned by NewsAPIClient
+
+        Returns:
+            The articles that were new to the region
+        """
+        window = self._windows.setdefault(region, OrderedDict())
+        new_articles = []
+        # NewsAPI returns newest first; insert oldest first so the window stays ordered
+        for article in reversed(articles):
+            self._stats["fetched"] += 1
+            url = article.get("url") or ""
+            digest = self._seen.get(url) if url else None
+            if digest is None:
+                digest = content_hash(article)
+
+            if digest in window:
+                self._stats["duplicates"] += 1
+            else:
+                window[digest] = article
+                new_articles.append(article)
+                self._stats["new"] += 1
+
+            if url:
+                self._remember(url, digest)
+            self._remember(digest, digest)
+
+            published_at = article.get("published_at")
+            if published_at and published_at > self._newest.get(region, ""):
+                self._newest[region] = published_at
+
+        self._prune(region)
+        return new_articles
+
+    def recent(self, region: str, limit: int = 10) -> list[dict]:
+        """
+        Get a region's most recent articles, newest first.
+
+        Args:
+            region: Region name
+            limit: Maximum number of articles
+
+        Returns:
+            List of articles
+        """
+        self._prune(region)
+        window = self._windows.get(region)
+        if not window:
+            return []
+        return list(reversed(window.values()))[:limit]
+
+    def get_stats(self) -> dict:
+        """Get fetch and deduplication counters and window sizes."""
+        return {
+            **self._stats,
+            "tracked_articles": len(self._seen),
+            "windows": {region: len(window) for region, window in self._windows.items()},
+            "newest_published_at": dict(self._newest),
+        }
+
+
+# Global news feed shared by all news agents
+news_feed = NewsFeed()
@@ -0,0 +1,99 @@
+"""Daily upstream quota counters shared by all worker processes."""
+
+import sqlite3
+from typing import Optional
+from backend.config import get_settings
+
+
+class SQLiteQuotaStore:
+    """
+    Per-upstream daily call counters in an SQLite file.
+
+    Kept in the state database next to the snapshot log, so every worker
+    process on the host counts against the same daily quotas and a restart
+    does not reset them. A call is counted with one conditional upsert, so
+    concurrent workers can never admit more calls than the limit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        # Same database as the snapshot log, which may not have created its
+        # table yet: auto_vacuum must be chosen before the first table
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS upstream_quota (
+                upstream TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (upstream, day)
+            )
+            """
+        )
+
+    def try_use(self, upstream: str, day: str, limit: int) -> bool:
+        """
+        Count one call if fewer than ``limit`` were counted for the day.
+
+        Args:
+            upstream: Upstream name (limiter name)
+            day: Quota period (UTC date)
+            limit: Calls allowed for the caller's priority
+
+        Returns:
+            True if the call was counted, False if the limit is reached
+        """
+        if limit <= 0:
+            return False
+        cursor = self._conn.execute(
+            """
+            INSERT INTO upstream_quota (upstream, day, used) VALUES (?, ?, 1)
+            ON CONFLICT (upstream, day) DO UPDATE SET used = used + 1 WHERE used < ?
+            """,
+            (upstream, day, limit),
+        )
+        return cursor.rowcount > 0
+
+    def release(self, upstream: str, day: str) -> None:
+        """Uncount one call that was never made."""
+        self._conn.execute(
+            "UPDATE upstream_quota SET used = MAX(0, used - 1) WHERE upstream = ? AND day = ?",
+            (upstream, day),
+        )
+
+    def used(self, upstream: str, day: str) -> int:
+        """Calls counted for an upstream on a day."""
+        row = self._conn.execute(
+            "SELECT used FROM upstream_quota WHERE upstream = ? AND day = ?",
+            (upstream, day),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def prune(self, day: str) -> None:
+        """Delete the counters of days before ``day``."""
+        self._conn.execute("DELETE FROM upstream_quota WHERE day < ?", (day,))
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+
+def _create_quota_store() -> Optional[SQLiteQuotaStore]:
+    """Open the shared quota store in the state database (None for the memory backend)."""
+    settings = get_settings()
+    if settings.state_backend != "sqlite" or not settings.state_db_path:
+        return None
+    try:
+        return SQLiteQuotaStore(settings.state_db_path)
+    except sqlite3.Error as e:
+        print(f"[RateLimit] Could not open quota store {settings.state_db_path}: {str(e)}")
+        return None
+
+
+# Global quota store shared by the upstream limiters (None: per-process quotas)
+quota_store = _create_quota_store()
@@ -0,0 +1,406 @@
+"""Quota-aware async token-bucket rate limiting for upstream APIs."""
+
+import asyncio
+import heapq
+import itertools
+import math
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+from backend.config import get_settings
+from backend.services.quota_store import SQLiteQuotaStore, quota_store as shared_quota_store
+
+
+# Request priorities (lower is served first)
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Priority of upstream calls made by the current task (API requests are
+# interactive; the refresh scheduler runs its jobs as background)
+request_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def use_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed upstream calls (and tasks started there) at ``priority``."""
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+# Monotonic time by which the current task's result is needed (set by the
+# orchestrator's agent deadlines); queueing for capacity may use at most
+# DEADLINE_QUEUE_SHARE of the time left so the call itself can still finish
+call_deadline: ContextVar[Optional[float]] = ContextVar("call_deadline", default=None)
+DEADLINE_QUEUE_SHARE = 0.5
+
+
+@contextmanager
+def use_deadline(seconds: float) -> Iterator[None]:
+    """Bound the queueing of the enclosed upstream calls by a deadline ``seconds`` from now."""
+    deadline = time.monotonic() + seconds
+    current = call_deadline.get()
+    token = call_deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        call_deadline.reset(token)
+
+
+class RateLimitError(Exception):
+    """An upstream call was refused by its limiter."""
+
+
+class QuotaExhaustedError(RateLimitError):
+    """The upstream's daily quota (or the share open to the priority) is used up."""
+
+
+class QueueTimeoutError(RateLimitError):
+    """No capacity became available before the caller's deadline."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (seconds or HTTP date).
+
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    Token bucket allowing ``rate`` calls per second with bursts of ``burst``.
+
+    Callers that cannot be served immediately queue by priority, then in
+    arrival order, and give up with ``QueueTimeoutError`` after the timeout
+    of their priority, or earlier when half the time left before their
+    ``call_deadline`` has passed. Calls are counted against ``daily_quota`` (reset at
+    midnight UTC) when admitted; background calls may not use the last
+    ``interactive_reserve`` share of it. After an upstream 429 the bucket
+    pauses for the server's Retry-After. A non-positive rate disables the
+    rate limit and a zero quota disables quota accounting.
+
+    The token bucket is per process. The daily quota is per process too,
+    unless a ``quota_store`` is given: then every process sharing the store
+    counts against one quota that also survives restarts.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        name: str = "upstream",
+        daily_quota: int = 0,
+        interactive_reserve: float = 0.0,
+        timeouts: Optional[dict[int, float]] = None,
+        retry_after_seconds: float = 5.0,
+        quota_store: Optional[SQLiteQuotaStore] = None,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.daily_quota = max(0, daily_quota)
+        self.interactive_reserve = min(max(interactive_reserve, 0.0), 1.0)
+        self.timeouts = timeouts or {}
+        self.retry_after_seconds = retry_after_seconds
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # Heap of (priority, arrival, future) for queued callers
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._quota_day = self._today()
+        self.quota_used = 0
+        # Shared daily counters (only used when a quota is configured)
+        self.quota_store = quota_store if self.daily_quota else None
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self._stats = {"granted": 0, "timeouts": 0, "quota_rejections": 0, "throttled": 0}
+
+    @staticmethod
+    def _today() -> str:
+        """Current UTC date (the quota period)."""
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update (none while paused)."""
+        now = time.monotonic()
+        if self._updated < self._paused_until <= now:
+            # The upstream accepts a call again as soon as the pause ends
+            self._tokens = max(self._tokens, 1.0)
+        accrual_start = max(self._updated, self._paused_until)
+        if now > accrual_start:
+            self._tokens = min(self.burst, self._tokens + (now - accrual_start) * self.rate)
+        self._updated = now
+
+    def _roll_quota_day(self) -> str:
+        """Start a new quota period at midnight UTC and return the current day."""
+        today = self._today()
+        if today != self._quota_day:
+            self._quota_day = today
+            self.quota_used = 0
+            if self.quota_store is not None:
+                try:
+                    self.quota_store.prune(today)
+                except sqlite3.Error as e:
+                    self._drop_quota_store(e)
+        return today
+
+    def _drop_quota_store(self, error: sqlite3.Error) -> None:
+        """Fall back to per-process quota counting after a store failure."""
+        print(f"[RateLimit] Quota store failed, counting {self.name} calls locally: {str(error)}")
+        self.quota_store = None
+
+    def _load_quota_used(self) -> None:
+        """Refresh ``quota_used`` from the shared store (counts of all processes)."""
+        day = self._roll_quota_day()
+        if self.quota_store is not None:
+            try:
+                self.quota_used = self.quota_store.used(self.name, day)
+            except sqlite3.Error as e:
+                self._drop_quota_store(e)
+
+    def _quota_limit(self, priority: int) -> int:
+        """Calls per day open to ``priority`` (background calls leave the reserve)."""
+        reserve = 0
+        if priority > INTERACTIVE:
+            reserve = math.ceil(self.daily_quota * self.interactive_reserve)
+        return self.daily_quota - reserve
+
+    def _admit(self, priority: int) -> None:
+        """Count a call against the daily quota, or refuse it."""
+        today = self._roll_quota_day()
+        if not self.daily_quota:
+            self.quota_used += 1
+            return
+
+        limit = self._quota_limit(priority)
+        admitted = None
+        if self.quota_store is not None:
+            try:
+                admitted = self.quota_store.try_use(self.name, today, limit)
+                self.quota_used = self.quota_store.used(self.name, today)
+            except sqlite3.Error as e:
+                self._drop_quota_store(e)
+        if admitted is None:
+            admitted = self.quota_used < limit
+            if admitted:
+                self.quota_used += 1
+
+        if not admitted:
+            self._stats["quota_rejections"] += 1
+            raise QuotaExhaustedError(
+                f"{self.name} daily quota exhausted for {PRIORITY_NAMES.get(priority, priority)} "
+                f"calls ({self.quota_used}/{self.daily_quota} used)"
+            )
+
+    def _refund(self) -> None:
+        """Return the quota of a call that was never made."""
+        self.quota_used = max(0, self.quota_used - 1)
+        if self.quota_store is not None:
+            try:
+                self.quota_store.release(self.name, self._quota_day)
+            except sqlite3.Error as e:
+                self._drop_quota_store(e)
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to queued callers, highest priority first."""
+        try:
+            while self._waiters:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill()
+                while self._waiters and self._tokens >= 1:
+                    _, _, future = heapq.heappop(self._waiters)
+                    # Timed out or cancelled callers leave their future done
+                    if not future.done():
+                        future.set_result(None)
+                        self._tokens -= 1
+                while self._waiters and self._waiters[0][2].done():
+                    heapq.heappop(self._waiters)
+                if self._waiters:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self._dispatcher = None
+
+    async def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a call is allowed.
+
+        Args:
+            priority: Call priority (default: the current ``request_priority``)
+            timeout: Maximum time to queue (default: the priority's timeout,
+                capped by the current ``call_deadline``; None waits indefinitely)
+
+        Raises:
+            QuotaExhaustedError: The daily quota is used up for this priority
+            QueueTimeoutError: No capacity became available in time
+        """
+        if priority is None:
+            priority = request_priority.get()
+        self._admit(priority)
+        if self.rate <= 0:
+            self._stats["granted"] += 1
+            return
+
+        self._refill()
+        started = time.monotonic()
+        if not self._waiters and self._tokens >= 1 and started >= self._paused_until:
+            self._tokens -= 1
+            self._stats["granted"] += 1
+            return
+
+        if timeout is None:
+            timeout = self.timeouts.get(priority)
+            deadline = call_deadline.get()
+            if deadline is not None:
+                budget = max(0.0, (deadline - started) * DEADLINE_QUEUE_SHARE)
+                timeout = budget if timeout is None else min(timeout, budget)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._refund()
+            self._stats["timeouts"] += 1
+            raise QueueTimeoutError(f"{self.name}: no capacity within {round(timeout, 1):g}s") from None
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+        self._stats["granted"] += 1
+        self.waits += 1
+        self.wait_seconds_total += time.monotonic() - started
+
+    def quota_remaining(self, priority: int = INTERACTIVE) -> Optional[int]:
+        """Calls still allowed today at ``priority`` (None without a daily quota)."""
+        if not self.daily_quota:
+            return None
+        self._load_quota_used()
+        return max(0, self._quota_limit(priority) - self.quota_used)
+
+    @staticmethod
+    def seconds_until_quota_reset() -> float:
+        """Seconds until the daily quotas reset (midnight UTC)."""
+        now = datetime.now(timezone.utc)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (midnight - now).total_seconds()
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record an upstream rate-limit response (HTTP 429).
+
+        Empties the bucket and pauses it for ``retry_after`` seconds
+        (default: ``retry_after_seconds``).
+        """
+        delay = retry_after if retry_after is not None else self.retry_after_seconds
+        self._refill()
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._stats["throttled"] += 1
+        print(f"[RateLimit] {self.name} throttled upstream, pausing {delay:.1f}s")
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def get_stats(self) -> dict:
+        """Get the configured limits, remaining budget, queue and wait counters."""
+        self._refill()
+        self._load_quota_used()
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                queued[name] = queued.get(name, 0) + 1
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens_available": round(self._tokens, 2),
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "daily_quota": self.daily_quota or None,
+            "quota_used": self.quota_used,
+            "quota_remaining": max(0, self.daily_quota - self.quota_used) if self.daily_quota else None,
+            "quota_shared": self.quota_store is not None,
+            "queued": queued,
+            **self._stats,
+            "waits": self.waits,
+            "wait_seconds_total": round(self.wait_seconds_total, 2),
+        }
+
+
+def _create_upstream_limiters() -> dict[str, RateLimiter]:
+    """Create one limiter per upstream API from settings."""
+    settings = get_settings()
+    common = {
+        "interactive_reserve": settings.upstream_interactive_reserve,
+        "timeouts": {
+            INTERACTIVE: settings.upstream_interactive_timeout_seconds,
+            BACKGROUND: settings.upstream_background_timeout_seconds,
+        },
+        "retry_after_seconds": settings.upstream_retry_after_seconds,
+        "quota_store": shared_quota_store,
+    }
+    return {
+        "newsapi": RateLimiter(
+            settings.news_rate_limit_per_second,
+            settings.news_rate_limit_burst,
+            name="newsapi",
+            daily_quota=settings.news_daily_quota,
+            **common,
+        ),
+        "openweathermap": RateLimiter(
+            settings.weather_rate_limit_per_second,
+            settings.weather_rate_limit_burst,
+            name="openweathermap",
+            daily_quota=settings.weather_daily_quota,
+            **common,
+        ),
+        "openai": RateLimiter(
+            settings.openai_rate_limit_per_second,
+            settings.openai_rate_limit_burst,
+            name="openai",
+            daily_quota=settings.openai_daily_quota,
+            **common,
+        ),
+        "aisstream": RateLimiter(
+            settings.ais_connect_rate_limit_per_second,
+            settings.ais_connect_rate_limit_burst,
+            name="aisstream",
+            **common,
+        ),
+    }
+
+
+# Global limiters shared by all service clients, keyed by upstream
+upstream_limiters = _create_upstream_limiters()
@@ -0,0 +1,115 @@
+"""Multi-pattern matching of region, port and alias names in text."""
+
+from collections import deque
+from typing import Iterator
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over lowercase patterns.
+
+    Finds every occurrence of every pattern in one pass over the text,
+    independent of the number of patterns.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = [pattern.lower() for pattern in patterns]
+        # Per state: transitions, failure link, indices of patterns ending here
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        self._build()
+
+    def _build(self) -> None:
+        """Build the trie, then the failure links breadth first."""
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def search(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Find pattern occurrences.
+
+        Args:
+            text: Text to search (matched case-insensitively)
+
+        Yields:
+            (start offset, pattern index) for every occurrence
+        """
+        state = 0
+        for position, char in enumerate(text.lower()):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._out[state]:
+                yield position - len(self.patterns[index]) + 1, index
+
+
+class RegionMatcher:
+    """
+    Routes text to the regions whose name, port name or aliases it mentions.
+
+    Matches must fall on word boundaries, so "Rotterdam" does not match
+    inside "Rotterdammer".
+    """
+
+    def __init__(self, names: dict[str, list[str]]):
+        patterns = []
+        self._regions = []
+        for region, region_names in names.items():
+            for name in region_names:
+                if name:
+                    patterns.append(name)
+                    self._regions.append(region)
+        self._automaton = AhoCorasick(patterns)
+
+    @classmethod
+    def from_regions(cls, regions: dict) -> "RegionMatcher":
+        """Build the matcher from ``Settings.regions`` (name, "port" and "aliases")."""
+        return cls(
+            {
+                region: [region, config.get("port", ""), *config.get("aliases", [])]
+                for region, config in regions.items()
+            }
+        )
+
+    def match(self, text: str) -> set[str]:
+        """
+        Get the regions mentioned in a text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of region names
+        """
+        matched = set()
+        text = text.lower()
+        for start, index in self._automaton.search(text):
+            end = start + len(self._automaton.patterns[index])
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            matched.add(self._regions[index])
+        return matched
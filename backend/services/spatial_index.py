@@ -0,0 +1,164 @@
+"""Uniform-grid spatial index mapping AIS positions to port zones."""
+
+import math
+from typing import NamedTuple, Optional
+
+
+# Kilometres per degree of latitude
+KM_PER_DEGREE = 111.32
+
+
+class PortZone(NamedTuple):
+    """A port monitoring area: either a bounding box or a radius around a point."""
+
+    index: int
+    name: str
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    center_lat: Optional[float] = None
+    center_lon: Optional[float] = None
+    radius_km: Optional[float] = None
+
+    @property
+    def bbox(self) -> list[list[float]]:
+        """Enclosing box as [[lat1, lon1], [lat2, lon2]] (AIS Stream format)."""
+        return [[self.min_lat, self.min_lon], [self.max_lat, self.max_lon]]
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Exact membership test for a position."""
+        if not (self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon):
+            return False
+        if self.radius_km is None:
+            return True
+        # Equirectangular distance is accurate to well under 1% at port scales
+        dlat = lat - self.center_lat
+        dlon = (lon - self.center_lon) * math.cos(math.radians(self.center_lat))
+        return (dlat * dlat + dlon * dlon) * KM_PER_DEGREE * KM_PER_DEGREE <= self.radius_km * self.radius_km
+
+    def covers_cell(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> bool:
+        """Whether the whole grid cell lies inside the zone."""
+        if self.radius_km is not None:
+            return all(
+                self.contains(lat, lon)
+                for lat in (min_lat, max_lat)
+                for lon in (min_lon, max_lon)
+            )
+        return (
+            self.min_lat <= min_lat
+            and max_lat <= self.max_lat
+            and self.min_lon <= min_lon
+            and max_lon <= self.max_lon
+        )
+
+
+def bbox_zone(index: int, name: str, bbox: list[list[float]]) -> PortZone:
+    """Build a zone from an AIS Stream style [[lat1, lon1], [lat2, lon2]] box."""
+    (lat1, lon1), (lat2, lon2) = bbox
+    return PortZone(index, name, min(lat1, lat2), min(lon1, lon2), max(lat1, lat2), max(lon1, lon2))
+
+
+def radius_zone(index: int, name: str, lat: float, lon: float, radius_km: float) -> PortZone:
+    """Build a circular zone of ``radius_km`` around a point."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return PortZone(
+        index, name, lat - dlat, lon - dlon, lat + dlat, lon + dlon,
+        center_lat=lat, center_lon=lon, radius_km=radius_km,
+    )
+
+
+class PortSpatialIndex:
+    """
+    Uniform lat/lon grid over port zones.
+
+    Each grid cell lists the zones that fully cover it (no further check
+    needed) and the zones that only overlap it (exact test needed). A lookup
+    is one dict access plus a test against the few partially overlapping
+    zones, so assigning a position is O(1) on average regardless of how many
+    ports are monitored. Zones may overlap; a position can belong to any
+    number of them.
+    """
+
+    _EMPTY: tuple[int, ...] = ()
+
+    def __init__(self, zones: list[PortZone], cell_degrees: float = 0.5):
+        self.zones = zones
+        self.cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], tuple[tuple[int, ...], tuple[PortZone, ...]]] = {}
+        self._build()
+
+    @classmethod
+    def from_regions(cls, regions: dict, cell_degrees: float = 0.5) -> "PortSpatialIndex":
+        """
+        Build the index from ``Settings.regions``.
+
+        A region with ``radius_km`` gets a circular zone around its lat/lon;
+        otherwise its ``bbox`` is used. Regions with neither are skipped.
+        """
+        zones = []
+        for name, config in regions.items():
+            if config.get("radius_km"):
+                zones.append(radius_zone(len(zones), name, config["lat"], config["lon"], config["radius_km"]))
+            elif "bbox" in config:
+                zones.append(bbox_zone(len(zones), name, config["bbox"]))
+        return cls(zones, cell_degrees)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        """Grid cell key of a position."""
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _build(self) -> None:
+        """Register every zone in all the cells its bounding box touches."""
+        covering: dict[tuple[int, int], list[int]] = {}
+        partial: dict[tuple[int, int], list[PortZone]] = {}
+        size = self.cell_degrees
+
+        for zone in self.zones:
+            row_min, col_min = self._cell(zone.min_lat, zone.min_lon)
+            row_max, col_max = self._cell(zone.max_lat, zone.max_lon)
+            for row in range(row_min, row_max + 1):
+                for col in range(col_min, col_max + 1):
+                    cell = (row, col)
+                    if zone.covers_cell(row * size, col * size, (row + 1) * size, (col + 1) * size):
+                        covering.setdefault(cell, []).append(zone.index)
+                    else:
+                        partial.setdefault(cell, []).append(zone)
+
+        for cell in covering.keys() | partial.keys():
+            self._cells[cell] = (tuple(covering.get(cell, ())), tuple(partial.get(cell, ())))
+
+    def lookup(self, lat: float, lon: float) -> tuple[int, ...]:
+        """
+        Get the indices of all zones containing a position.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Tuple of zone indices (empty if the position is in no port zone)
+        """
+        entry = self._cells.get(
+            (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+        )
+        if entry is None:
+            return self._EMPTY
+        inside, candidates = entry
+        if not candidates:
+            return inside
+        matches = tuple(zone.index for zone in candidates if zone.contains(lat, lon))
+        return inside + matches if matches else inside
+
+    def subscription_boxes(self) -> list[list[list[float]]]:
+        """Enclosing boxes of every zone, for the AIS Stream subscription."""
+        return [zone.bbox for zone in self.zones]
+
+    def stats(self) -> dict:
+        """Get index size information."""
+        return {
+            "zones": len(self.zones),
+            "cells": len(self._cells),
+            "cell_degrees": self.cell_degrees,
+        }
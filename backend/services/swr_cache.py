@@ -0,0 +1,165 @@
+"""Size-bounded TTL cache with stale-while-revalidate."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterator
+
+
+# Whether lookups made by the current task must reach the upstream (the
+# refresh scheduler publishes new data and must not re-serve cached values)
+_bypass: ContextVar[bool] = ContextVar("swr_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Load every cache lookup in the enclosed block (and tasks started there) from upstream."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class SWRCache:
+    """
+    LRU cache of async results with a freshness TTL and a stale window.
+
+    - Fresh entries (younger than ``ttl_seconds``) are returned directly.
+    - Stale entries (younger than ``ttl_seconds + stale_seconds``) are
+      returned immediately while one background task refreshes them.
+    - Missing or expired entries are loaded inline. Concurrent loads of the
+      same key share one upstream call.
+
+    Only results accepted by ``cacheable`` are stored, so upstream errors
+    are never served from the cache. Inside ``bypass_cache()`` every lookup
+    is loaded from upstream and stored; if that load fails, an entry still
+    within the stale window is returned instead.
+
+    Args:
+        ttl_seconds: Age under which an entry is fresh
+        stale_seconds: Extra age during which a stale entry is still served
+        max_entries: LRU size bound
+        cacheable: Predicate deciding whether a loaded result is stored
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        stale_seconds: float,
+        max_entries: int,
+        cacheable: Callable[[Any], bool] = lambda result: True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max(1, max_entries)
+        self.cacheable = cacheable
+        # key -> (value, stored_at), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "bypasses": 0,
+            "evictions": 0,
+        }
+        self._load_seconds_total = 0.0
+        self._loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the loader and store its result if cacheable."""
+        started = time.monotonic()
+        result = await loader()
+        self._load_seconds_total += time.monotonic() - started
+        self._loads += 1
+        if self.cacheable(result):
+            self._entries[key] = (result, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return result
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start (or join) the single in-flight load for a key."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        """Count failed background refreshes (the stale value stays cached)."""
+        if task.cancelled():
+            return
+        if task.exception() is not None or not self.cacheable(task.result()):
+            self._stats["refresh_errors"] += 1
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a value, loading or revalidating it as needed.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument coroutine function fetching the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        entry = self._entries.get(key)
+        if _bypass.get():
+            self._stats["bypasses"] += 1
+            result = await asyncio.shield(self._start_load(key, loader))
+            if not self.cacheable(result) and entry is not None:
+                value, stored_at = entry
+                if time.monotonic() - stored_at < self.ttl_seconds + self.stale_seconds:
+                    return value
+            return result
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                if key not in self._in_flight:
+                    self._stats["refreshes"] += 1
+                    self._start_load(key, loader).add_done_callback(self._on_refresh_done)
+                return value
+
+        self._stats["misses"] += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    async def close(self) -> None:
+        """Cancel background refreshes still running."""
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        """Get hit/miss/refresh counters and the upstream calls and time saved."""
+        served = self._stats["hits"] + self._stats["stale_hits"]
+        lookups = served + self._stats["misses"] + self._stats["bypasses"]
+        avg_load = self._load_seconds_total / self._loads if self._loads else 0.0
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(served / lookups, 3) if lookups else None,
+            "upstream_calls_saved": served - self._stats["refreshes"],
+            "avg_upstream_seconds": round(avg_load, 3),
+            "latency_saved_seconds": round(served * avg_load, 1),
+        }
@@ -0,0 +1,330 @@
+"""Compact columnar store of live vessel positions keyed by MMSI."""
+
+import bisect
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Optional
+
+
+# NavigationalStatus codes: 0=underway using engine, 1=at anchor, 5=moored
+NAV_UNDERWAY = 0
+NAV_AT_ANCHOR = 1
+STATIONARY_STATUSES = frozenset((1, 5))
+
+
+def _zeros(typecode: str, length: int) -> array:
+    """Create a zero-filled typed array."""
+    return array(typecode, bytes(array(typecode).itemsize * length))
+
+
+class RollingQuantiles:
+    """
+    Quantiles over the most recent ``size`` values.
+
+    Values are kept both in arrival order (to expire the oldest) and in a
+    sorted list, so adding a value costs one binary-search insert and one
+    removal, and reading any quantile is a single index lookup.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._order: deque[float] = deque()
+        self._sorted: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, value: float) -> None:
+        """Add a value, expiring the oldest once the window is full."""
+        if len(self._order) == self.size:
+            oldest = self._order.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._order.append(value)
+        bisect.insort(self._sorted, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile (0-1) of the window, or None if it is empty."""
+        if not self._sorted:
+            return None
+        index = min(len(self._sorted) - 1, max(0, int(q * len(self._sorted))))
+        return self._sorted[index]
+
+
+class VesselTable:
+    """
+    Live vessel table backed by typed arrays with slot reuse.
+
+    Each vessel occupies one slot across parallel columns (lat, lon, sog,
+    cog, nav_status, last_seen). Freed slots are recycled, so memory only
+    grows with the peak number of concurrently tracked vessels. Per-port
+    aggregates (count, stationary count, moving count, speed sum) are
+    updated incrementally on every upsert and eviction, so reading them is
+    O(1) regardless of fleet size.
+
+    Vessels are kept in least-recently-seen order, which makes TTL eviction
+    proportional to the number of expired vessels rather than the table size.
+
+    Each vessel also carries a small state machine: its arrival time in the
+    port area and, while it is at anchor, when it started waiting. A wait
+    ends when the vessel reports any other status (typically moored at a
+    berth) or leaves the area; its duration is added to the port's rolling
+    window of completed waits. Queue length (vessels at anchor) and the
+    summed arrival and wait-start times are maintained like the other
+    aggregates, so current dwell and waiting times are also O(1) to read.
+
+    A vessel already at anchor when it is first seen (after a restart,
+    during warm-up or after a TTL eviction) has a wait of unknown start.
+    Such waits are censored: the vessel counts towards the queue length but
+    not towards current or completed waiting times. A vessel evicted by the
+    TTL ends its wait at its last report.
+    """
+
+    def __init__(
+        self,
+        num_ports: int,
+        ttl_seconds: float,
+        initial_capacity: int = 1024,
+        wait_window_size: int = 500,
+    ):
+        self.num_ports = num_ports
+        self.ttl_seconds = ttl_seconds
+
+        capacity = max(1, initial_capacity)
+        self.mmsi = _zeros("q", capacity)
+        self.lat = _zeros("d", capacity)
+        self.lon = _zeros("d", capacity)
+        self.sog = _zeros("d", capacity)
+        self.cog = _zeros("d", capacity)
+        self.nav_status = _zeros("b", capacity)
+        self.last_seen = _zeros("d", capacity)
+        # When the vessel entered the port area / started waiting (0 = not waiting)
+        self.arrived_at = _zeros("d", capacity)
+        self.wait_started = _zeros("d", capacity)
+        # 1 while the vessel waits at anchor since before it was first seen
+        self.wait_censored = _zeros("b", capacity)
+        self.ports: list[tuple[int, ...]] = [()] * capacity
+
+        # mmsi -> slot, ordered from least to most recently seen
+        self._slots: OrderedDict[int, int] = OrderedDict()
+        self._free: list[int] = list(range(capacity - 1, -1, -1))
+        # Shared tuples for port memberships so slots do not each own one
+        self._port_sets: dict[tuple[int, ...], tuple[int, ...]] = {}
+
+        self.port_count = _zeros("l", num_ports)
+        self.port_stationary = _zeros("l", num_ports)
+        self.port_moving = _zeros("l", num_ports)
+        self.port_sog_sum = _zeros("d", num_ports)
+        self.port_arrived_sum = _zeros("d", num_ports)
+        self.port_waiting = _zeros("l", num_ports)
+        # Uncensored waits only
+        self.port_timed_waiting = _zeros("l", num_ports)
+        self.port_wait_started_sum = _zeros("d", num_ports)
+        self.port_waits = [RollingQuantiles(wait_window_size) for _ in range(num_ports)]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def capacity(self) -> int:
+        """Number of allocated slots."""
+        return len(self.mmsi)
+
+    def _columns(self) -> tuple[array, ...]:
+        """All per-vessel typed columns."""
+        return (
+            self.mmsi,
+            self.lat,
+            self.lon,
+            self.sog,
+            self.cog,
+            self.nav_status,
+            self.last_seen,
+            self.arrived_at,
+            self.wait_started,
+            self.wait_censored,
+        )
+
+    def _grow(self) -> None:
+        """Double the column capacity and add the new slots to the free list."""
+        old = self.capacity
+        for column in self._columns():
+            column.extend(_zeros(column.typecode, old))
+        self.ports.extend([()] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def _apply(self, slot: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a slot's contribution to port aggregates."""
+        status = self.nav_status[slot]
+        stationary = sign if status in STATIONARY_STATUSES else 0
+        moving = sign if status == NAV_UNDERWAY else 0
+        speed = sign * self.sog[slot]
+        arrived = sign * self.arrived_at[slot]
+        wait_started = self.wait_started[slot]
+        waiting = sign if wait_started else 0
+        timed = waiting if not self.wait_censored[slot] else 0
+        for port in self.ports[slot]:
+            self.port_count[port] += sign
+            self.port_stationary[port] += stationary
+            self.port_moving[port] += moving
+            self.port_sog_sum[port] += speed
+            self.port_arrived_sum[port] += arrived
+            if waiting:
+                self.port_waiting[port] += waiting
+            if timed:
+                self.port_timed_waiting[port] += timed
+                self.port_wait_started_sum[port] += sign * wait_started
+                if self.port_timed_waiting[port] == 0:
+                    self.port_wait_started_sum[port] = 0.0
+            if self.port_count[port] == 0:
+                # Avoid floating-point drift once a port empties
+                self.port_sog_sum[port] = 0.0
+                self.port_arrived_sum[port] = 0.0
+
+    def _end_wait(self, slot: int, ended_at: float) -> None:
+        """Close a slot's open wait and record its duration (unless censored) for its ports."""
+        wait_started = self.wait_started[slot]
+        if not wait_started:
+            return
+        if not self.wait_censored[slot]:
+            duration = max(0.0, ended_at - wait_started)
+            for port in self.ports[slot]:
+                self.port_waits[port].add(duration)
+        self.wait_started[slot] = 0.0
+        self.wait_censored[slot] = 0
+
+    def upsert(
+        self,
+        mmsi: int,
+        lat: float,
+        lon: float,
+        sog: float,
+        cog: float,
+        nav_status: int,
+        ports: tuple[int, ...],
+        seen_at: Optional[float] = None,
+    ) -> None:
+        """
+        Insert or update a vessel's latest position report.
+
+        Args:
+            mmsi: Vessel MMSI
+            lat: Latitude
+            lon: Longitude
+            sog: Speed over ground (knots)
+            cog: Course over ground (degrees)
+            nav_status: AIS NavigationalStatus code
+            ports: Indices of the ports the position falls in
+            seen_at: POSIX time of the report (default: now)
+        """
+        seen_at = seen_at if seen_at is not None else time.time()
+        slot = self._slots.get(mmsi)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self.mmsi[slot] = mmsi
+            self.arrived_at[slot] = seen_at
+            self.wait_started[slot] = 0.0
+            # Already anchored when first seen: the wait started earlier
+            self.wait_censored[slot] = 1 if nav_status == NAV_AT_ANCHOR else 0
+        else:
+            self._apply(slot, -1)
+            self._slots.move_to_end(mmsi)
+
+        # Anchored -> waiting; any other status ends the wait
+        if nav_status == NAV_AT_ANCHOR:
+            if not self.wait_started[slot]:
+                self.wait_started[slot] = seen_at
+        else:
+            self._end_wait(slot, seen_at)
+
+        self._slots[mmsi] = slot
+        self.lat[slot] = lat
+        self.lon[slot] = lon
+        self.sog[slot] = sog
+        self.cog[slot] = cog
+        self.nav_status[slot] = nav_status if 0 <= nav_status <= 15 else 15
+        self.last_seen[slot] = seen_at
+        self.ports[slot] = self._port_sets.setdefault(ports, ports)
+        self._apply(slot, 1)
+
+    def remove(self, mmsi: int, departed_at: Optional[float] = None) -> bool:
+        """
+        Remove a vessel and release its slot.
+
+        Args:
+            mmsi: Vessel MMSI
+            departed_at: POSIX time the vessel left every port area (or
+                was last seen, for TTL eviction). When given, an open wait
+                is recorded as completed; otherwise it is discarded.
+        """
+        slot = self._slots.pop(mmsi, None)
+        if slot is None:
+            return False
+        self._apply(slot, -1)
+        if departed_at is not None:
+            self._end_wait(slot, departed_at)
+        self.ports[slot] = ()
+        self._free.append(slot)
+        return True
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """
+        Drop vessels not seen within the TTL.
+
+        Returns:
+            Number of vessels evicted
+        """
+        cutoff = (now if now is not None else time.time()) - self.ttl_seconds
+        evicted = 0
+        while self._slots:
+            mmsi, slot = next(iter(self._slots.items()))
+            if self.last_seen[slot] >= cutoff:
+                break
+            # Not heard from since its last report: treat that as its departure
+            self.remove(mmsi, departed_at=self.last_seen[slot])
+            evicted += 1
+        return evicted
+
+    def get_port_stats(self, port: int, now: Optional[float] = None) -> dict:
+        """
+        Get aggregate vessel metrics for one port.
+
+        Args:
+            port: Port index
+            now: POSIX time used for in-progress durations (default: now)
+
+        Returns:
+            dict with vessel_count, stationary_count, moving_count, avg_speed,
+            queue_length, avg_dwell_hours, avg_current_wait_hours (uncensored
+            waits only), median_wait_hours, p90_wait_hours and completed_waits
+        """
+        now = now if now is not None else time.time()
+        count = self.port_count[port]
+        waiting = self.port_timed_waiting[port]
+        waits = self.port_waits[port]
+        median_wait = waits.quantile(0.5)
+        p90_wait = waits.quantile(0.9)
+        return {
+            "vessel_count": count,
+            "stationary_count": self.port_stationary[port],
+            "moving_count": self.port_moving[port],
+            "avg_speed": round(self.port_sog_sum[port] / count, 2) if count else 0,
+            "queue_length": self.port_waiting[port],
+            "avg_dwell_hours": (
+                round((now - self.port_arrived_sum[port] / count) / 3600, 2) if count else None
+            ),
+            "avg_current_wait_hours": (
+                round((now - self.port_wait_started_sum[port] / waiting) / 3600, 2)
+                if waiting
+                else None
+            ),
+            "median_wait_hours": round(median_wait / 3600, 2) if median_wait is not None else None,
+            "p90_wait_hours": round(p90_wait / 3600, 2) if p90_wait is not None else None,
+            "completed_waits": len(waits),
+        }
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the column arrays."""
+        return sum(column.itemsize * len(column) for column in self._columns())
@@ -1,6 +1,25 @@
+import asyncio
 import httpx
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional
 from backend.config import get_settings
+from backend.services.http_pool import HTTPPool, http_pool
+from backend.services.rate_limit import RateLimiter, RateLimitError, upstream_limiters
+from backend.services.swr_cache import SWRCache
+
+
+def _create_weather_cache() -> SWRCache:
+    """Create the weather response cache from settings (only successful responses are kept)."""
+    settings = get_settings()
+    return SWRCache(
+        ttl_seconds=settings.weather_cache_ttl_seconds,
+        stale_seconds=settings.weather_cache_stale_seconds,
+        max_entries=settings.weather_cache_max_entries,
+        cacheable=lambda result: result.get("status") == "ok",
+    )
+
+
+# Global weather response cache shared by all weather clients
+weather_cache = _create_weather_cache()
 
 
 class WeatherAPIClient:
@@ -8,14 +27,66 @@ class WeatherAPIClient:
 
     BASE_URL = "https://api.openweathermap.org/data/2.5"
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool: Optional[HTTPPool] = None,
+        cache: Optional[SWRCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.settings = get_settings()
+        self.pool = pool if pool is not None else http_pool
+        self.cache = cache if cache is not None else weather_cache
+        # Only requests reaching OpenWeatherMap are limited (not cache hits)
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None else upstream_limiters["openweathermap"]
+        )
         self.api_key = self.settings.openweather_api_key
 
+    def _cache_key(self, endpoint: str, lat: float, lon: float) -> tuple:
+        """Cache key: endpoint and coordinates rounded to the configured precision."""
+        precision = self.settings.weather_cache_precision
+        return (endpoint, round(lat, precision), round(lon, precision))
+
     async def fetch_current_weather(self, lat: float, lon: float) -> dict:
         """
         Fetch current weather for given coordinates.
 
+        Served from the weather cache (stale-while-revalidate) when possible.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            dict with weather data or error information
+        """
+        return await self.cache.get(
+            self._cache_key("weather", lat, lon),
+            lambda: self._request_current_weather(lat, lon),
+        )
+
+    async def fetch_forecast(self, lat: float, lon: float) -> dict:
+        """
+        Fetch 5-day weather forecast for given coordinates.
+
+        Served from the weather cache (stale-while-revalidate) when possible.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            dict with forecast data or error information
+        """
+        return await self.cache.get(
+            self._cache_key("forecast", lat, lon),
+            lambda: self._request_forecast(lat, lon),
+        )
+
+    async def _request_current_weather(self, lat: float, lon: float) -> dict:
+        """
+        Request current weather for given coordinates from the API.
+
         Args:
             lat: Latitude
             lon: Longitude
@@ -38,27 +109,28 @@ class WeatherAPIClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{self.BASE_URL}/weather", params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                return {
-                    "status": "ok",
-                    "data": {
-                        "temperature_c": data.get("main", {}).get("temp"),
-                        "feels_like_c": data.get("main", {}).get("feels_like"),
-                        "humidity_percent": data.get("main", {}).get("humidity"),
-                        "wind_speed_ms": data.get("wind", {}).get("speed"),
-                        "wind_speed_kmh": data.get("wind", {}).get("speed", 0) * 3.6,
-                        "condition": data.get("weather", [{}])[0].get("main", "Unknown"),
-                        "description": data.get("weather", [{}])[0].get("description", ""),
-                        "visibility_m": data.get("visibility"),
-                        "clouds_percent": data.get("clouds", {}).get("all"),
-                        "rain_1h_mm": data.get("rain", {}).get("1h", 0),
-                        "rain_3h_mm": data.get("rain", {}).get("3h", 0),
-                    },
-                }
+            response = await self.pool.get(
+                f"{self.BASE_URL}/weather", limiter=self.rate_limiter, params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            return {
+                "status": "ok",
+                "data": {
+                    "temperature_c": data.get("main", {}).get("temp"),
+                    "feels_like_c": data.get("main", {}).get("feels_like"),
+                    "humidity_percent": data.get("main", {}).get("humidity"),
+                    "wind_speed_ms": data.get("wind", {}).get("speed"),
+                    "wind_speed_kmh": data.get("wind", {}).get("speed", 0) * 3.6,
+                    "condition": data.get("weather", [{}])[0].get("main", "Unknown"),
+                    "description": data.get("weather", [{}])[0].get("description", ""),
+                    "visibility_m": data.get("visibility"),
+                    "clouds_percent": data.get("clouds", {}).get("all"),
+                    "rain_1h_mm": data.get("rain", {}).get("1h", 0),
+                    "rain_3h_mm": data.get("rain", {}).get("3h", 0),
+                },
+            }
 
         except httpx.HTTPStatusError as e:
             return {
@@ -72,6 +144,12 @@ class WeatherAPIClient:
                 "message": f"Request error: {str(e)}",
                 "data": None,
             }
+        except RateLimitError as e:
+            return {
+                "status": "error",
+                "message": f"Rate limited: {str(e)}",
+                "data": None,
+            }
         except Exception as e:
             return {
                 "status": "error",
@@ -79,9 +157,9 @@ class WeatherAPIClient:
                 "data": None,
             }
 
-    async def fetch_forecast(self, lat: float, lon: float) -> dict:
+    async def _request_forecast(self, lat: float, lon: float) -> dict:
         """
-        Fetch 5-day weather forecast for given coordinates.
+        Request the 5-day weather forecast for given coordinates from the API.
 
         Args:
             lat: Latitude
@@ -105,27 +183,28 @@ class WeatherAPIClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{self.BASE_URL}/forecast", params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                forecasts = []
-                for item in data.get("list", [])[:8]:  # Next 24 hours (3-hour intervals)
-                    forecasts.append(
-                        {
-                            "datetime": item.get("dt_txt"),
-                            "temperature_c": item.get("main", {}).get("temp"),
-                            "wind_speed_kmh": item.get("wind", {}).get("speed", 0) * 3.6,
-                            "condition": item.get("weather", [{}])[0].get("main"),
-                            "rain_3h_mm": item.get("rain", {}).get("3h", 0),
-                        }
-                    )
-
-                return {
-                    "status": "ok",
-                    "data": forecasts,
-                }
+            response = await self.pool.get(
+                f"{self.BASE_URL}/forecast", limiter=self.rate_limiter, params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            forecasts = []
+            for item in data.get("list", []):  # Full 5-day horizon (3-hour intervals)
+                forecasts.append(
+                    {
+                        "datetime": item.get("dt_txt"),
+                        "temperature_c": item.get("main", {}).get("temp"),
+                        "wind_speed_kmh": item.get("wind", {}).get("speed", 0) * 3.6,
+                        "condition": item.get("weather", [{}])[0].get("main"),
+                        "rain_3h_mm": item.get("rain", {}).get("3h", 0),
+                    }
+                )
+
+            return {
+                "status": "ok",
+                "data": forecasts,
+            }
 
         except httpx.HTTPStatusError as e:
             return {
@@ -139,6 +218,12 @@ class WeatherAPIClient:
                 "message": f"Request error: {str(e)}",
                 "data": None,
             }
+        except RateLimitError as e:
+            return {
+                "status": "error",
+                "message": f"Rate limited: {str(e)}",
+                "data": None,
+            }
         except Exception as e:
             return {
                 "status": "error",
@@ -146,6 +231,28 @@ class WeatherAPIClient:
                 "data": None,
             }
 
+    async def fetch_weather_at(self, lat: float, lon: float) -> dict:
+        """
+        Fetch current weather and forecast for coordinates concurrently.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            dict with current weather and forecast
+        """
+        current, forecast = await asyncio.gather(
+            self.fetch_current_weather(lat, lon),
+            self.fetch_forecast(lat, lon),
+        )
+
+        return {
+            "status": "ok" if current["status"] == "ok" else "error",
+            "current": current.get("data"),
+            "forecast": forecast.get("data"),
+        }
+
     async def fetch_weather_for_region(self, region: str) -> dict:
         """
         Fetch weather data for a named region.
@@ -167,13 +274,63 @@ class WeatherAPIClient:
             }
 
         coords = regions[region]
-        lat, lon = coords["lat"], coords["lon"]
+        return await self.fetch_weather_at(coords["lat"], coords["lon"])
 
-        current = await self.fetch_current_weather(lat, lon)
-        forecast = await self.fetch_forecast(lat, lon)
+    async def fetch_weather_bulk(
+        self, coordinates: Iterable[tuple[float, float]]
+    ) -> AsyncIterator[tuple[tuple[float, float], dict]]:
+        """
+        Fetch weather for many coordinates, yielding results as they complete.
 
-        return {
-            "status": "ok" if current["status"] == "ok" else "error",
-            "current": current.get("data"),
-            "forecast": forecast.get("data"),
-        }
+        Coordinates that share a cache key are fetched once. At most
+        ``Settings.weather_bulk_concurrency`` locations are fetched at a
+        time, and every upstream request also passes the shared rate limiter.
+
+        Args:
+            coordinates: (lat, lon) pairs
+
+        Yields:
+            ((lat, lon), result) for every requested coordinate, where result
+            is shaped like fetch_weather_at's return value
+        """
+        groups: dict[tuple, list[tuple[float, float]]] = {}
+        for lat, lon in coordinates:
+            groups.setdefault(self._cache_key("location", lat, lon), []).append((lat, lon))
+
+        semaphore = asyncio.Semaphore(max(1, self.settings.weather_bulk_concurrency))
+
+        async def fetch(points: list[tuple[float, float]]) -> tuple[list, dict]:
+            async with semaphore:
+                return points, await self.fetch_weather_at(*points[0])
+
+        tasks = [asyncio.create_task(fetch(points)) for points in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                points, result = await next_done
+                for point in points:
+                    yield point, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_weather_for_regions(
+        self, regions: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Fetch weather for many regions concurrently, yielding as each completes.
+
+        Args:
+            regions: Region names (default: every configured region)
+
+        Yields:
+            (region, result) pairs shaped like fetch_weather_for_region's return value
+        """
+        configured = self.settings.regions
+        names = [name for name in (regions or configured) if name in configured]
+        by_point: dict[tuple[float, float], list[str]] = {}
+        for name in names:
+            by_point.setdefault((configured[name]["lat"], configured[name]["lon"]), []).append(name)
+
+        async for point, result in self.fetch_weather_bulk(by_point):
+            for name in by_point.pop(point, []):
+                yield name, result
@@ -0,0 +1,174 @@
+import sqlite3
+import time
+from typing import Optional
+
+
+class SQLiteSnapshotLog:
+    """
+    Append-only on-disk log of compressed SystemState snapshots.
+
+    Backed by SQLite in WAL mode so appends are a single small sequential
+    write and readers never block the writer. Retention is enforced by
+    periodic compaction: snapshots older than ``retention_days`` or beyond
+    ``max_rows_per_region`` per region are deleted and the freed pages are
+    returned to the filesystem.
+
+    Several processes (e.g. uvicorn workers) may share one file:
+    ``has_changes`` cheaply detects commits made by other connections and
+    ``read_since`` returns the new snapshots.
+    """
+
+    # Run compaction after this many appends
+    COMPACT_EVERY = 500
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = 30.0,
+        max_rows_per_region: int = 20000,
+    ):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_rows_per_region = max_rows_per_region
+        self._appends_since_compact = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum must be chosen before the first table is created
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                region TEXT NOT NULL,
+                ts REAL NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_snapshots_region_id ON snapshots (region, id)"
+        )
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def append(self, region: str, ts: float, payload: bytes) -> int:
+        """
+        Persist one compressed snapshot.
+
+        Args:
+            region: Region the snapshot belongs to
+            ts: POSIX timestamp of the snapshot
+            payload: zlib-compressed SystemState JSON
+
+        Returns:
+            Row id of the stored snapshot
+        """
+        cursor = self._conn.execute(
+            "INSERT INTO snapshots (region, ts, payload) VALUES (?, ?, ?)",
+            (region, ts, payload),
+        )
+
+        self._appends_since_compact += 1
+        if self._appends_since_compact >= self.COMPACT_EVERY:
+            self.compact()
+
+        return cursor.lastrowid
+
+    def has_changes(self) -> bool:
+        """Whether another connection has committed since the last call."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def last_id(self) -> int:
+        """Row id of the newest snapshot, or 0 if the log is empty."""
+        row = self._conn.execute("SELECT MAX(id) FROM snapshots").fetchone()
+        return row[0] or 0
+
+    def read_since(self, after_id: int) -> list[tuple[int, str, float, bytes]]:
+        """
+        Read snapshots appended after a given row id.
+
+        Args:
+            after_id: Last row id already seen
+
+        Returns:
+            List of (id, region, ts, payload) ordered by id
+        """
+        return self._conn.execute(
+            "SELECT id, region, ts, payload FROM snapshots WHERE id > ? ORDER BY id",
+            (after_id,),
+        ).fetchall()
+
+    def load_recent(self, limit_per_region: int) -> dict[str, list[tuple[float, bytes]]]:
+        """
+        Load the newest snapshots of every region for a warm start.
+
+        Args:
+            limit_per_region: Maximum snapshots returned per region
+
+        Returns:
+            dict of region -> [(ts, payload), ...] ordered oldest first
+        """
+        regions = [
+            row[0] for row in self._conn.execute("SELECT DISTINCT region FROM snapshots")
+        ]
+
+        recent = {}
+        for region in regions:
+            rows = self._conn.execute(
+                "SELECT ts, payload FROM snapshots WHERE region = ? ORDER BY id DESC LIMIT ?",
+                (region, limit_per_region),
+            ).fetchall()
+            rows.reverse()
+            recent[region] = rows
+        return recent
+
+    def compact(self) -> int:
+        """
+        Apply the retention policy and reclaim disk space.
+
+        Returns:
+            Number of snapshots deleted
+        """
+        self._appends_since_compact = 0
+        deleted = 0
+
+        cutoff = time.time() - self.retention_days * 86400
+        deleted += self._conn.execute("DELETE FROM snapshots WHERE ts < ?", (cutoff,)).rowcount
+
+        for (region,) in self._conn.execute("SELECT DISTINCT region FROM snapshots").fetchall():
+            boundary = self._conn.execute(
+                "SELECT id FROM snapshots WHERE region = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                (region, self.max_rows_per_region),
+            ).fetchone()
+            if boundary:
+                deleted += self._conn.execute(
+                    "DELETE FROM snapshots WHERE region = ? AND id <= ?",
+                    (region, boundary[0]),
+                ).rowcount
+
+        if deleted:
+            self._conn.execute("PRAGMA incremental_vacuum")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def close(self) -> None:
+        """Checkpoint the WAL and close the database."""
+        try:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            self._conn.close()
+
+
+def open_snapshot_log(path: Optional[str], **kwargs) -> Optional[SQLiteSnapshotLog]:
+    """Open the snapshot log at ``path``, or return None if persistence is disabled."""
+    if not path:
+        return None
+    try:
+        return SQLiteSnapshotLog(path, **kwargs)
+    except sqlite3.Error as e:
+        print(f"[State] Could not open snapshot log {path}: {str(e)}")
+        return None
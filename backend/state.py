@@ -1,33 +1,275 @@
-from datetime import datetime
+import zlib
+from array import array
+from datetime import datetime, timezone
 from typing import Optional
 from backend.models.schemas import SystemState
+from backend.config import get_settings
+from backend.snapshot_log import SQLiteSnapshotLog, open_snapshot_log
+
+
+def utc_timestamp(value: datetime) -> float:
+    """POSIX timestamp of a datetime, treating naive values as UTC (like SystemState.timestamp)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def encode_snapshot(state: SystemState) -> bytes:
+    """Serialize a SystemState to compressed JSON."""
+    return zlib.compress(state.model_dump_json().encode(), 1)
+
+
+def decode_snapshot(payload: bytes) -> SystemState:
+    """Deserialize a SystemState from compressed JSON."""
+    return SystemState.model_validate_json(zlib.decompress(payload))
+
+
+class SnapshotHistory:
+    """
+    Fixed-size ring buffer of compressed SystemState snapshots for one region.
+
+    Snapshots are stored as zlib-compressed JSON next to a parallel array of
+    POSIX timestamps, so memory is bounded by ``capacity`` and time-range
+    queries are a binary search over the timestamps.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._timestamps = array("d", [0.0] * self.capacity)
+        self._payloads: list[Optional[bytes]] = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, index: int) -> int:
+        """Map a logical index (0 = oldest) to a buffer slot."""
+        return (self._start + index) % self.capacity
+
+    def append(self, state: SystemState) -> None:
+        """Add a snapshot, overwriting the oldest one when full."""
+        self.append_encoded(utc_timestamp(state.timestamp), encode_snapshot(state))
+
+    def append_encoded(self, ts: float, payload: bytes) -> None:
+        """Add an already-compressed snapshot taken at POSIX time ``ts``."""
+        if self._size:
+            # Keep timestamps sorted even if snapshots finish out of order
+            ts = max(ts, self._timestamps[self._slot(self._size - 1)])
+
+        if self._size < self.capacity:
+            slot = self._slot(self._size)
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._timestamps[slot] = ts
+        self._payloads[slot] = payload
+
+    def _bisect_left(self, ts: float) -> int:
+        """First logical index whose timestamp is >= ts."""
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamps[self._slot(mid)] < ts:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> list[SystemState]:
+        """
+        Get snapshots with since <= timestamp <= until, oldest first.
+
+        Args:
+            since: Inclusive lower bound (default: oldest snapshot)
+            until: Inclusive upper bound (default: newest snapshot)
+
+        Returns:
+            List of decoded SystemState snapshots
+        """
+        first = self._bisect_left(utc_timestamp(since)) if since else 0
+        last = self._size
+        if until is not None:
+            until_ts = utc_timestamp(until)
+            while last > first and self._timestamps[self._slot(last - 1)] > until_ts:
+                last -= 1
+
+        return [decode_snapshot(self._payloads[self._slot(i)]) for i in range(first, last)]
 
 
 class StateStore:
-    """In-memory state store for system outputs."""
+    """
+    Per-region state store with bounded in-memory snapshot history.
+
+    When a snapshot log is attached, every update is also appended to disk
+    and the latest state and recent history of each region are reloaded from
+    it at startup. The log doubles as the shared backend for multiple worker
+    processes: before every read the store checks the log for snapshots
+    written by other processes and applies them to its in-memory view.
+    """
+
+    def __init__(
+        self,
+        history_size: Optional[int] = None,
+        log: Optional[SQLiteSnapshotLog] = None,
+    ):
+        self.settings = get_settings()
+        self.history_size = history_size or self.settings.state_history_size
+        self.log = log
+        self._states: dict[str, SystemState] = {}
+        self._last_updated: dict[str, datetime] = {}
+        self._history: dict[str, SnapshotHistory] = {}
+        self._last_region: Optional[str] = None
+        # Newest log row applied to memory, and rows this process wrote since
+        self._last_seen_id = 0
+        self._own_ids: set[int] = set()
+
+        if self.log is not None:
+            self._warm_start()
+
+    def _history_for(self, region: str) -> SnapshotHistory:
+        """Get or create the snapshot ring buffer of a region."""
+        history = self._history.get(region)
+        if history is None:
+            history = self._history[region] = SnapshotHistory(self.history_size)
+        return history
+
+    def _warm_start(self) -> None:
+        """Reload recent snapshots of every region from the snapshot log."""
+        try:
+            self._last_seen_id = self.log.last_id()
+            recent = self.log.load_recent(self.history_size)
+        except Exception as e:
+            print(f"[State] Warm start from snapshot log failed: {str(e)}")
+            return
+
+        for region, rows in recent.items():
+            if not rows:
+                continue
+            history = self._history_for(region)
+            for ts, payload in rows:
+                history.append_encoded(ts, payload)
+
+            ts, payload = rows[-1]
+            self._states[region] = decode_snapshot(payload)
+            self._last_updated[region] = datetime.utcfromtimestamp(ts)
+
+        self._last_region = max(self._last_updated, key=self._last_updated.get, default=None)
+
+    def _sync(self) -> None:
+        """Apply snapshots that other processes appended to the shared log."""
+        if self.log is None:
+            return
+        try:
+            if not self.log.has_changes():
+                return
+            rows = self.log.read_since(self._last_seen_id)
+        except Exception as e:
+            print(f"[State] Failed to read shared snapshot log: {str(e)}")
+            return
 
-    def __init__(self):
-        self._state: Optional[SystemState] = None
-        self._last_updated: Optional[datetime] = None
+        for row_id, region, ts, payload in rows:
+            self._last_seen_id = row_id
+            if row_id in self._own_ids:
+                continue
+            self._history_for(region).append_encoded(ts, payload)
+            self._states[region] = decode_snapshot(payload)
+            self._last_updated[region] = datetime.utcfromtimestamp(ts)
+            self._last_region = region
+        self._own_ids = {row_id for row_id in self._own_ids if row_id > self._last_seen_id}
 
     def update(self, state: SystemState) -> None:
-        """Update the current system state."""
-        self._state = state
-        self._last_updated = datetime.utcnow()
+        """Update the current state for the state's region and record it in history."""
+        self._sync()
+
+        region = state.region
+        self._states[region] = state
+        self._last_updated[region] = datetime.utcnow()
+        self._last_region = region
+
+        ts = utc_timestamp(state.timestamp)
+        payload = encode_snapshot(state)
+        self._history_for(region).append_encoded(ts, payload)
+
+        if self.log is not None:
+            try:
+                row_id = self.log.append(region, ts, payload)
+                if row_id == self._last_seen_id + 1:
+                    self._last_seen_id = row_id
+                else:
+                    self._own_ids.add(row_id)
+            except Exception as e:
+                print(f"[State] Failed to persist snapshot for {region}: {str(e)}")
+
+    def get(self, region: Optional[str] = None) -> Optional[SystemState]:
+        """Get the current state for a region (default: the most recently updated region)."""
+        self._sync()
+        region = region or self._last_region
+        return self._states.get(region) if region else None
+
+    def get_last_updated(self, region: Optional[str] = None) -> Optional[datetime]:
+        """Get the timestamp of the last update for a region (default: most recent)."""
+        self._sync()
+        region = region or self._last_region
+        return self._last_updated.get(region) if region else None
+
+    def get_history(
+        self,
+        region: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> list[SystemState]:
+        """Get past snapshots for a region within a time range, oldest first."""
+        self._sync()
+        history = self._history.get(region)
+        return history.range(since, until) if history else []
+
+    def get_regions(self) -> list[str]:
+        """Get the regions that have a stored state."""
+        self._sync()
+        return list(self._states.keys())
+
+    def clear(self, region: Optional[str] = None) -> None:
+        """Clear state and history for one region, or for all regions."""
+        if region is None:
+            self._states.clear()
+            self._last_updated.clear()
+            self._history.clear()
+            self._last_region = None
+            return
+
+        self._states.pop(region, None)
+        self._last_updated.pop(region, None)
+        self._history.pop(region, None)
+        if self._last_region == region:
+            self._last_region = max(
+                self._last_updated, key=self._last_updated.get, default=None
+            )
+
+    def close(self) -> None:
+        """Flush and close the snapshot log, if any."""
+        if self.log is not None:
+            self.log.close()
+            self.log = None
 
-    def get(self) -> Optional[SystemState]:
-        """Get the current system state."""
-        return self._state
 
-    def get_last_updated(self) -> Optional[datetime]:
-        """Get the timestamp of the last update."""
-        return self._last_updated
+def _create_state_store() -> StateStore:
+    """Create the global store for the configured backend (memory or sqlite)."""
+    settings = get_settings()
+    if settings.state_backend == "memory":
+        return StateStore()
 
-    def clear(self) -> None:
-        """Clear the current state."""
-        self._state = None
-        self._last_updated = None
+    log = open_snapshot_log(
+        settings.state_db_path,
+        retention_days=settings.state_retention_days,
+        max_rows_per_region=settings.state_db_max_rows_per_region,
+    )
+    return StateStore(log=log)
 
 
 # Global state instance
-state_store = StateStore()
+state_store = _create_state_store()
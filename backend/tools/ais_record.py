@@ -0,0 +1,70 @@
+"""
+Record raw AIS Stream frames to a compact log for offline replay.
+
+Subscribes to the port zones of every configured region (the same
+subscription the ingestion daemon uses) and writes each frame with its
+receive timestamp.
+
+Usage:
+    python -m backend.tools.ais_record --out shanghai.aislog.gz --seconds 600
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import websockets
+from backend.config import get_settings
+from backend.services.ais_log import AISLogWriter
+from backend.services.spatial_index import PortSpatialIndex
+
+
+async def record(path: str, seconds: float, url: str) -> int:
+    """
+    Record frames for a fixed duration.
+
+    Args:
+        path: Output log path
+        seconds: Recording duration
+        url: AIS Stream websocket URL
+
+    Returns:
+        Number of frames recorded
+    """
+    settings = get_settings()
+    if not settings.aisstream_api_key:
+        raise ValueError("AIS Stream API key not configured")
+
+    index = PortSpatialIndex.from_regions(settings.regions, settings.ais_grid_cell_degrees)
+    subscribe_message = {
+        "APIKey": settings.aisstream_api_key,
+        "BoundingBoxes": index.subscription_boxes(),
+        "FilterMessageTypes": ["PositionReport"],
+    }
+
+    with AISLogWriter(path) as writer:
+        async with websockets.connect(url) as websocket:
+            await websocket.send(json.dumps(subscribe_message))
+            try:
+                async with asyncio.timeout(seconds):
+                    async for frame in websocket:
+                        writer.write(time.time(), frame)
+            except asyncio.TimeoutError:
+                pass
+        return writer.frames
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", required=True, help="Output log path (gzip)")
+    parser.add_argument("--seconds", type=float, default=300, help="Recording duration")
+    parser.add_argument("--url", default=settings.aisstream_url, help="AIS Stream websocket URL")
+    args = parser.parse_args()
+
+    frames = asyncio.run(record(args.out, args.seconds, args.url))
+    print(f"[AIS] Recorded {frames} frames to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Local websocket server replaying a recorded AIS frame log.
+
+Speaks enough of the AIS Stream protocol for AISStreamService and the
+ingestion daemon: each client sends its subscription message and then
+receives the recorded frames. Set AISSTREAM_URL=ws://127.0.0.1:8765 (and
+any non-empty AISSTREAM_API_KEY) to run the backend against it.
+
+Usage:
+    python -m backend.tools.ais_replay shanghai.aislog.gz --speed 10
+    python -m backend.tools.ais_replay shanghai.aislog.gz --speed 0   # max speed
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Optional
+import websockets
+from backend.services.ais_log import read_ais_log
+
+
+class AISReplayServer:
+    """
+    Replays recorded frames to every client that connects.
+
+    Args:
+        frames: (received_at, frame) tuples, e.g. from read_ais_log
+        speed: Replay speed relative to the recording (1 = real time,
+            N = N times faster, 0 = as fast as possible)
+        loop: Restart from the beginning when the log is exhausted
+    """
+
+    def __init__(self, frames: list[tuple[float, bytes]], speed: float = 1.0, loop: bool = False):
+        self.frames = frames
+        self.speed = speed
+        self.loop = loop
+        self._server = None
+
+    async def _replay(self, websocket) -> None:
+        """Send the log to one client, preserving the recorded timing."""
+        await websocket.recv()  # subscription message
+        while True:
+            if not self.frames:
+                break
+            first_ts = self.frames[0][0]
+            started = time.monotonic()
+            for index, (received_at, frame) in enumerate(self.frames):
+                if self.speed > 0:
+                    delay = (received_at - first_ts) / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif index % 256 == 0:
+                    await asyncio.sleep(0)
+                await websocket.send(frame)
+            if not self.loop:
+                break
+
+    async def _handler(self, websocket) -> None:
+        try:
+            await self._replay(websocket)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """Start listening."""
+        self._server = await websockets.serve(self._handler, host, port, max_size=None)
+
+    @property
+    def url(self) -> Optional[str]:
+        """ws:// URL of the running server."""
+        if self._server is None:
+            return None
+        host, port = list(self._server.sockets)[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server and disconnect clients."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def serve(path: str, host: str, port: int, speed: float, loop: bool) -> None:
+    """Serve a log until interrupted."""
+    frames = list(read_ais_log(path))
+    server = AISReplayServer(frames, speed=speed, loop=loop)
+    await server.start(host, port)
+    print(f"[AIS] Replaying {len(frames)} frames from {path} at {server.url} (speed={speed or 'max'})")
+    try:
+        await asyncio.Future()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", help="Recorded log path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 0 = max speed")
+    parser.add_argument("--loop", action="store_true", help="Repeat the log forever")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.log, args.host, args.port, args.speed, args.loop))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()